@@ -5,7 +5,8 @@ import router from './routes';
 const app = express();
 const port = process.env.PORT || 3002;
 
-app.use(express.json());
+// Bulk product batches are larger than the 100kb default
+app.use(express.json({ limit: process.env.JSON_BODY_LIMIT || '10mb' }));
 
 app.use('/api', router);
 
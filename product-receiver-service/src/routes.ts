@@ -43,6 +43,13 @@ const storeSchema = z.object({
   zip_code: z.string().optional(),
 });
 
+// Bulk product schema: items are validated one by one in the handler,
+// so one bad product doesn't reject the rest of the batch
+const BULK_MAX_PRODUCTS = parseInt(process.env.BULK_MAX_PRODUCTS || '1000', 10);
+const bulkProductSchema = z.object({
+  products: z.array(z.unknown()).min(1).max(BULK_MAX_PRODUCTS),
+});
+
 // Validate product request
 function validateProduct(req: Request, res: Response, next: NextFunction) {
   const result = productSchema.safeParse(req.body);
@@ -98,6 +105,26 @@ async function sendToLogstash(data: any): Promise<void> {
   });
 }
 
+// Writes many events over a single Logstash connection
+async function sendManyToLogstash(events: any[]): Promise<void> {
+  if (events.length === 0) {
+    return;
+  }
+  return new Promise((resolve, reject) => {
+    const client = new net.Socket();
+    const logstashHost = process.env.LOGSTASH_HOST || 'localhost';
+    const logstashPort = parseInt(process.env.LOGSTASH_PORT || '50000', 10);
+
+    client.connect(logstashPort, logstashHost, () => {
+      client.write(events.map((event) => JSON.stringify(event)).join('\n') + '\n');
+      client.end();
+    });
+
+    client.on('error', (err) => reject(err));
+    client.on('close', () => resolve());
+  });
+}
+
 function renameLongToLng(data: any): any {
   const cloned = { ...data };
   if (cloned.localization?.long !== undefined) {
@@ -260,6 +287,65 @@ async function createOrUpdateProductHandler(req: Request, res: Response) {
   }
 }
 
+/**
+ * Upserts a batch of products: { products: [...] }.
+ * Each product is validated and upserted on its own, so the response reports a status
+ * per index ('created', 'updated', 'invalid' or 'failed') and the client only resends the
+ * failed ones. The Logstash events of the batch go out over one connection.
+ */
+async function bulkProductsHandler(req: Request, res: Response) {
+  const parsed = bulkProductSchema.safeParse(req.body);
+  if (!parsed.success) {
+    return res.status(400).json({
+      error: 'Validation error',
+      details: parsed.error.format()
+    });
+  }
+
+  const results: any[] = [];
+  const events: any[] = [];
+  let saved = 0;
+
+  for (const [index, raw] of parsed.data.products.entries()) {
+    const item = productSchema.safeParse(raw);
+    if (!item.success) {
+      results.push({ index, status: 'invalid', error: item.error.format() });
+      continue;
+    }
+    try {
+      const data = renameLongToLng(item.data);
+      const result = await upsertProductWithRetry(data);
+      if (!result) {
+        results.push({ index, status: 'failed', error: 'Failed to save product' });
+        continue;
+      }
+      const { product, action } = result;
+      events.push({
+        id: product.id,
+        ...data,
+        name_id: product.name_id,
+        name: product.name,
+        action,
+      });
+      results.push({ index, status: action, id: product.id });
+      saved++;
+    } catch (error: any) {
+      console.error('Error saving product:', error);
+      results.push({ index, status: 'failed', error: error.message });
+    }
+  }
+
+  try {
+    await sendManyToLogstash(events);
+  } catch (error: any) {
+    // The products are saved already, resending the batch would only duplicate their history
+    console.error('Error sending bulk events to Logstash:', error);
+  }
+
+  console.info(`Bulk products: ${saved} saved, ${results.length - saved} not saved`);
+  return res.status(200).json({ saved, failed: results.length - saved, results });
+}
+
 async function createOrUpdateStoreHandler(req: Request, res: Response) {
   try {
     console.log('Received store data:', req.body);
@@ -343,6 +429,9 @@ router.get('/health', (_req, res) => {
 // POST /product
 router.post('/product', validateProduct, createOrUpdateProductHandler);
 
+// POST /products/bulk
+router.post('/products/bulk', bulkProductsHandler);
+
 // POST /store
 router.post('/store', validateStore, createOrUpdateStoreHandler);
 
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import argparse
+from bs4 import BeautifulSoup
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+try:
+	from libft import CONAD_CARDS, TIGRE_CARDS
+	from libft.html_parsing import HAS_LXML, HAS_SELECTOLAX
+except ImportError:
+	print("Error: libft module not found. Please ensure it's in your PYTHONPATH or in the same directory.")
+	sys.exit(1)
+
+# Compares how many product cards per second each parsing backend extracts.
+# Feed it listing pages saved from the browser (driver.page_source), or let it build a synthetic
+# Conad-like page:
+#   python benchmark_parsing.py --layout conad saved_page.html
+#   python benchmark_parsing.py --layout conad --synthetic 500
+# "legacy" is what the scrapers did before: html.parser plus a separate lookup for every field.
+
+LAYOUTS = {"conad": CONAD_CARDS, "tigre": TIGRE_CARDS}
+
+def synthetic_conad_page(cards):
+	card = (
+		'<div class="uk-width-1-1 component-ProductCard">'
+		'<img data-src="https://example.com/{i}.jpg">'
+		'<div class="no-t-decoration product-description uk-position-relative"><h3>Prodotto {i}</h3></div>'
+		'<b class="product-quantity">500 g</b>'
+		'<div class="product-price f-roboto uk-margin-auto-left">{i},99 &euro;</div>'
+		'<div class="product-price-kg">{i},98 &euro;/kg</div>'
+		'</div>'
+	)
+	body = "".join(card.format(i=i) for i in range(cards))
+	return (
+		'<html><body><div class="product-results uk-child-width-1-1 uk-child-width-1-2@l '
+		f'uk-child-width-1-3@xl uk-grid">{body}</div></body></html>'
+	)
+
+def legacy_parse(layout, html):
+	soup = BeautifulSoup(html, 'html.parser')
+	rows = []
+	for container in soup.select(layout.container):
+		for card in container.select(layout.card):
+			row = {}
+			for name, (selector, read) in layout.fields.items():
+				element = card.select_one(selector)
+				if element is None:
+					row[name] = None
+				else:
+					row[name] = element.get_text(strip=True) if read == "text" else element.get(read)
+			rows.append(row)
+	return rows
+
+def run(name, parse, pages, repeat):
+	cards = 0
+	start = time.perf_counter()
+	for _ in range(repeat):
+		for html in pages:
+			cards += len(parse(html))
+	elapsed = time.perf_counter() - start
+	print(f"{name:12} {cards:8} cards in {elapsed:7.3f}s  {cards / elapsed if elapsed else 0:10.1f} cards/s")
+	return cards
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Benchmark the HTML parsing backends on product listing pages.")
+	parser.add_argument("pages", nargs="*", help="saved listing pages")
+	parser.add_argument("--layout", choices=LAYOUTS, default="conad")
+	parser.add_argument("--synthetic", type=int, default=0, help="build a synthetic Conad page with this many cards")
+	parser.add_argument("--repeat", type=int, default=5)
+	args = parser.parse_args()
+
+	layout = LAYOUTS[args.layout]
+	pages = []
+	for path in args.pages:
+		with open(path, encoding="utf-8") as file:
+			pages.append(file.read())
+	if args.synthetic:
+		pages.append(synthetic_conad_page(args.synthetic))
+	if not pages:
+		parser.error("pass saved pages or --synthetic N")
+
+	backends = ["html.parser"]
+	if HAS_LXML:
+		backends.append("lxml")
+	if HAS_SELECTOLAX:
+		backends.append("selectolax")
+
+	run("legacy", lambda html: legacy_parse(layout, html), pages, args.repeat)
+	for backend in backends:
+		run(backend, lambda html: layout.parse(html, backend), pages, args.repeat)
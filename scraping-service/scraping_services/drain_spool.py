@@ -0,0 +1,34 @@
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+load_dotenv()
+
+try:
+	from libft import SpoolDrain, SPOOL_DIR
+	from libft.spool import SPOOL_DRAIN_BATCH
+except ImportError:
+	print("Error: libft module not found. Please ensure it's in your PYTHONPATH or in the same directory.")
+	sys.exit(1)
+
+# Ships the products the scrapers spooled (SCRAPER_SPOOL=1) to the product receiver.
+#   python drain_spool.py            sends what is spooled and exits
+#   python drain_spool.py --follow   keeps running next to the scrapers
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description="Send the spooled products to the product receiver.")
+	parser.add_argument("--follow", action="store_true", help="keep waiting for new segments")
+	parser.add_argument("--spool-dir", default=SPOOL_DIR, help="spool directory (default: SPOOL_DIR)")
+	parser.add_argument("--batch-size", type=int, default=SPOOL_DRAIN_BATCH, help="products per insertMany (default: SPOOL_DRAIN_BATCH)")
+	args = parser.parse_args()
+
+	drain = SpoolDrain(args.spool_dir, batch_size=args.batch_size)
+	try:
+		drain.drain(follow=args.follow)
+	except KeyboardInterrupt:
+		# Accepted batches are recorded in the segment offsets, the rest is sent next time
+		print(f"Stopped after sending {drain.sent_products} products")
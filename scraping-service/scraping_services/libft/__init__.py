@@ -14,10 +14,64 @@ from .libft_utility import (
 	read_csv_to_list_of_dicts,
 )
 
+# Import from http_client.py
+from .http_client import (
+	HttpClient,
+	get_client,
+)
+
+# Import from browser_waits.py
+from .browser_waits import (
+	install_network_tracker,
+	wait_for_dom_ready,
+	wait_for_network_idle,
+	wait_for_selector,
+	wait_for_any,
+	wait_for_navigation,
+	click_when_ready,
+	StepTimer,
+)
+
+# Import from browser_factory.py
+from .browser_factory import (
+	build_driver,
+	TransferMeter,
+)
+
+# Import from browser_session.py
+from .browser_session import (
+	copy_cookies_to_session,
+	snapshot_name,
+	save_session_snapshot,
+	restore_session_snapshot,
+	discard_session_snapshot,
+)
+
+# Import from network_capture.py
+from .network_capture import (
+	enable_performance_log,
+	drain_performance_log,
+	captured_json_responses,
+	fetch_json,
+)
+
+# Import from html_parsing.py
+from .html_parsing import (
+	CardLayout,
+	make_soup,
+	resolve_backend,
+	CONAD_CARDS,
+	TIGRE_CARDS,
+)
+
 # Import from send_data.py
 from .send_data import (
 	send_data_to_receiver,
+	send_products_to_receiver,
+	resend_products,
+	ProductSender,
 	create_store,
+	create_stores,
 	get_store_by_grocery_and_city,
 )
 
@@ -30,12 +84,86 @@ from .libft_gros import (
 	geocode,
 )
 
+# Import from geocode_cache.py
+from .geocode_cache import (
+	GeocodeCache,
+	get_geocode_cache,
+	normalize_address,
+)
+
+# Import from cedigros_shop.py
+from .cedigros_shop import (
+	scrape_cedigros_banner,
+)
+
+# Import from fan_out.py
+from .fan_out import (
+	ProductFanOut,
+	compact_localizations,
+)
+
+# Import from shop_progress.py
+from .shop_progress import (
+	ShopProgress,
+	shop_key,
+)
+
+# Import from spool.py
+from .spool import (
+	Spool,
+	SpoolDrain,
+	get_spool,
+	product_sender,
+	SCRAPER_SPOOL,
+	SPOOL_DIR,
+)
+
+# Import from checkpoint.py
+from .checkpoint import (
+	Checkpoint,
+	CATEGORY_DONE,
+)
+
+# Import from crawl_state.py
+from .crawl_state import (
+	CrawlState,
+	CategoryUpdate,
+)
+
+# Import from gros_crawler.py
+from .gros_crawler import (
+	run_gros_banner,
+	crawl_banner,
+	build_product_data,
+	read_category_cache,
+	write_category_cache,
+)
+
 # Define what is exposed when `from libft import *` is used
 __all__ = [
 	"wait_for_element_conad",
 	"wait_for_element",
 	"wait_for_elements_conad",
 	"wait_for_elements",
+	"install_network_tracker",
+	"wait_for_dom_ready",
+	"wait_for_network_idle",
+	"wait_for_selector",
+	"wait_for_any",
+	"wait_for_navigation",
+	"click_when_ready",
+	"StepTimer",
+	"enable_performance_log",
+	"drain_performance_log",
+	"captured_json_responses",
+	"fetch_json",
+	"build_driver",
+	"TransferMeter",
+	"copy_cookies_to_session",
+	"snapshot_name",
+	"save_session_snapshot",
+	"restore_session_snapshot",
+	"discard_session_snapshot",
 	"fetch_data",
 	"extract_micro_categories",
 	"update_env_with_dotenv",
@@ -46,10 +174,44 @@ __all__ = [
 	"has_superficie",
 	"has_phone_number",
 	"geocode",
+	"GeocodeCache",
+	"get_geocode_cache",
+	"normalize_address",
+	"HttpClient",
+	"get_client",
+	"CardLayout",
+	"make_soup",
+	"resolve_backend",
+	"CONAD_CARDS",
+	"TIGRE_CARDS",
 	"send_data_to_receiver",
+	"send_products_to_receiver",
+	"resend_products",
+	"ProductSender",
 	"create_store",
+	"create_stores",
+	"scrape_cedigros_banner",
 	"get_all_stores",
 	"get_store_by_grocery_and_city",
 	"write_list_of_dicts_to_csv",
 	"read_csv_to_list_of_dicts",
+	"ProductFanOut",
+	"compact_localizations",
+	"CrawlState",
+	"CategoryUpdate",
+	"Checkpoint",
+	"Spool",
+	"SpoolDrain",
+	"get_spool",
+	"product_sender",
+	"SCRAPER_SPOOL",
+	"SPOOL_DIR",
+	"CATEGORY_DONE",
+	"ShopProgress",
+	"shop_key",
+	"run_gros_banner",
+	"crawl_banner",
+	"build_product_data",
+	"read_category_cache",
+	"write_category_cache",
 ]
@@ -0,0 +1,128 @@
+import os
+import atexit
+import shutil
+import tempfile
+import threading
+from selenium.common.exceptions import WebDriverException
+
+from .browser_waits import install_network_tracker
+from .network_capture import enable_performance_log
+
+# Builds the Chrome drivers of the Selenium scrapers.
+# The scrapers only read HTML text and image URLs, so by default the browser doesn't download
+# images, media, fonts or the usual analytics/ads scripts: images are disabled through the
+# profile prefs and the rest is blocked by URL pattern through CDP Network.setBlockedURLs.
+# The V8 heap and the number of renderers are capped so a pool of browsers fits in memory.
+# BROWSER_PROFILE_TEMPLATE points to a user-data dir (consent cookies, settings) that every
+# driver starts from; each driver gets its own copy, removed at exit.
+# TransferMeter reports the bytes each page pulled, to compare runs with and without blocking.
+
+CHROME_BINARY = os.getenv("CHROME_BINARY", "/usr/bin/google-chrome")
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "1") == "1"
+BROWSER_MAX_HEAP_MB = int(os.getenv("BROWSER_MAX_HEAP_MB", 512))
+BROWSER_PROFILE_TEMPLATE = os.getenv("BROWSER_PROFILE_TEMPLATE")
+
+BLOCKED_URL_PATTERNS = [
+	"*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+	"*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+	"*.mp4", "*.webm", "*.mp3", "*.m3u8",
+	"*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+	"*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*criteo.*", "*taboola.com*",
+	"*clarity.ms*", "*bing.com/bat*", "*tiktok.com*",
+]
+
+# uc.Chrome patches the chromedriver binary on start, which isn't safe to do concurrently
+_driver_lock = threading.Lock()
+_profile_dirs = []
+
+def _copy_profile_template():
+	profile_dir = tempfile.mkdtemp(prefix="scraper-profile-")
+	shutil.copytree(BROWSER_PROFILE_TEMPLATE, profile_dir, dirs_exist_ok=True)
+	_profile_dirs.append(profile_dir)
+	return profile_dir
+
+@atexit.register
+def _remove_profile_copies():
+	for profile_dir in _profile_dirs:
+		shutil.rmtree(profile_dir, ignore_errors=True)
+
+def build_driver(headless=True, block_resources=BROWSER_BLOCK_RESOURCES, capture_network=False):
+	"""Starts an undetected Chrome with the resource blocking, memory caps and profile template.
+	Returns: The driver, with the network tracker of browser_waits installed."""
+	# Imported here so the HTTP-only scrapers can use libft without a browser stack
+	import undetected_chromedriver as uc
+
+	options = uc.ChromeOptions()
+	options.binary_location = CHROME_BINARY
+
+	if headless:
+		options.add_argument("--headless=new")
+	options.add_argument("--no-sandbox")
+	options.add_argument("--disable-dev-shm-usage")
+	options.add_argument(f"--js-flags=--max-old-space-size={BROWSER_MAX_HEAP_MB}")
+	options.add_argument("--renderer-process-limit=2")
+	options.add_argument("--disable-extensions")
+	if block_resources:
+		options.add_argument("--blink-settings=imagesEnabled=false")
+		options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+	if capture_network:
+		enable_performance_log(options)
+
+	kwargs = {}
+	if BROWSER_PROFILE_TEMPLATE:
+		kwargs["user_data_dir"] = _copy_profile_template()
+
+	with _driver_lock:
+		driver = uc.Chrome(options=options, use_subprocess=False, **kwargs)
+
+	if block_resources:
+		try:
+			driver.execute_cdp_cmd("Network.enable", {})
+			driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+		except WebDriverException as e:
+			print(f"Resource blocking not available: {e}")
+	install_network_tracker(driver)
+	return driver
+
+PAGE_TRANSFER = """
+var counted = window.__transferCounted === true;
+window.__transferCounted = true;
+var navigation = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var bytes = counted || !navigation ? 0 : navigation.transferSize;
+for (var i = 0; i < resources.length; i++) { bytes += resources[i].transferSize || 0; }
+performance.clearResourceTimings();
+return [bytes, resources.length, counted || !navigation ? 0 : navigation.duration];
+"""
+
+class TransferMeter:
+	"""Sums the bytes transferred (document and resources) and load time of each page."""
+
+	def __init__(self, name):
+		self.name = name
+		self.pages = 0
+		self.bytes = 0
+		self.requests = 0
+		self.load_ms = 0.0
+		self._lock = threading.Lock()
+
+	def record(self, driver):
+		"""Counts what the current page transferred since the last record on it."""
+		try:
+			transferred, requests, load_ms = driver.execute_script(PAGE_TRANSFER)
+		except WebDriverException:
+			return
+		with self._lock:
+			self.pages += 1
+			self.bytes += transferred
+			self.requests += requests
+			self.load_ms += load_ms
+
+	def report(self):
+		if not self.pages:
+			return
+		print(
+			f"{self.name}: {self.pages} pages, {self.bytes / 1e6:.1f} MB transferred "
+			f"({self.bytes / self.pages / 1e3:.0f} kB and {self.requests / self.pages:.0f} requests per page, "
+			f"{self.load_ms / self.pages:.0f} ms average document load)"
+		)
@@ -0,0 +1,93 @@
+import os
+import re
+import json
+import time
+import requests
+from selenium.common.exceptions import WebDriverException
+
+from .crawl_state import CRAWL_STATE_DIR
+
+# Hands a browser session over to plain HTTP, and keeps it between runs.
+# The store selection on the supermarket sites lives in cookies, so once Selenium has picked
+# a shop its cookies (and user agent, which some sites tie the session to) can be copied into a
+# requests session and server-rendered pages fetched without a browser.
+# A session snapshot saves the cookies and localStorage of a selected shop, so the next run
+# restores them instead of going through the cookie banner, address and store picker again.
+# Snapshots older than SESSION_SNAPSHOT_TTL are ignored; the caller checks a restored session
+# with one cheap request and falls back to the full flow when the site no longer accepts it.
+
+SESSION_SNAPSHOT_DIR = os.getenv("SESSION_SNAPSHOT_DIR", os.path.join(CRAWL_STATE_DIR, "sessions"))
+SESSION_SNAPSHOT_TTL = float(os.getenv("SESSION_SNAPSHOT_TTL", 12 * 60 * 60))
+
+def copy_cookies_to_session(driver, session):
+	"""Copies every cookie of the driver's current site into a requests session."""
+	for cookie in driver.get_cookies():
+		session.cookies.set_cookie(requests.cookies.create_cookie(
+			name=cookie["name"],
+			value=cookie["value"],
+			domain=cookie.get("domain", ""),
+			path=cookie.get("path", "/"),
+			secure=cookie.get("secure", False),
+			expires=cookie.get("expiry"),
+		))
+	session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+	return session
+
+def snapshot_name(site, key):
+	"""File-safe snapshot name for a site and a shop key (see shop_key)."""
+	return f"{site}_{re.sub(r'[^A-Za-z0-9]+', '_', key).strip('_').lower()}"
+
+def _snapshot_path(name):
+	return os.path.join(SESSION_SNAPSHOT_DIR, f"{name}.json")
+
+def save_session_snapshot(driver, name):
+	"""Saves the cookies and localStorage of the driver's current site."""
+	snapshot = {
+		"saved_at": time.time(),
+		"url": driver.current_url,
+		"cookies": driver.get_cookies(),
+		"local_storage": driver.execute_script("return Object.assign({}, window.localStorage);"),
+	}
+	os.makedirs(SESSION_SNAPSHOT_DIR, exist_ok=True)
+	tmp_path = f"{_snapshot_path(name)}.tmp"
+	with open(tmp_path, 'w', encoding='utf-8') as file:
+		json.dump(snapshot, file)
+	os.replace(tmp_path, _snapshot_path(name))
+
+def restore_session_snapshot(driver, name, start_url, ttl=SESSION_SNAPSHOT_TTL):
+	"""Loads start_url with the saved cookies and localStorage.
+	Returns: True if a fresh snapshot was restored, False if there is none to restore."""
+	try:
+		with open(_snapshot_path(name), 'r', encoding='utf-8') as file:
+			snapshot = json.load(file)
+	except (OSError, ValueError):
+		return False
+	if time.time() - snapshot.get("saved_at", 0) >= ttl:
+		return False
+
+	try:
+		# Cookies can only be set for the site the browser is on
+		driver.get(start_url)
+		driver.delete_all_cookies()
+		for cookie in snapshot["cookies"]:
+			cookie = dict(cookie)
+			if "expiry" in cookie:
+				cookie["expiry"] = int(cookie["expiry"])
+			if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+				cookie.pop("sameSite", None)
+			driver.add_cookie(cookie)
+		driver.execute_script(
+			"for (var key in arguments[0]) { window.localStorage.setItem(key, arguments[0][key]); }",
+			snapshot["local_storage"],
+		)
+		driver.get(start_url)
+	except WebDriverException as e:
+		print(f"Could not restore session {name}: {e}")
+		return False
+	return True
+
+def discard_session_snapshot(name):
+	try:
+		os.remove(_snapshot_path(name))
+	except FileNotFoundError:
+		pass
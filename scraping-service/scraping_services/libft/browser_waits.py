@@ -0,0 +1,155 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException, ElementClickInterceptedException
+from selenium.webdriver.support import expected_conditions as EC
+
+# Event-driven waits for the Selenium scrapers, in place of fixed time.sleep calls.
+# Every wait returns as soon as its condition holds and gives up after BROWSER_WAIT_TIMEOUT.
+# Network idle is tracked by a small script injected in every document that counts the
+# fetch/XHR requests still in flight; install_network_tracker must run before the first get.
+# StepTimer collects how long each named step of a flow took, so slow steps show up in the logs.
+
+BROWSER_WAIT_TIMEOUT = float(os.getenv("BROWSER_WAIT_TIMEOUT", 30))
+BROWSER_IDLE_TIME = float(os.getenv("BROWSER_IDLE_TIME", 0.5))
+BROWSER_POLL_INTERVAL = float(os.getenv("BROWSER_POLL_INTERVAL", 0.1))
+
+CONDITIONS = {
+	"present": EC.presence_of_element_located,
+	"visible": EC.visibility_of_element_located,
+	"clickable": EC.element_to_be_clickable,
+}
+
+NETWORK_TRACKER = """
+(function () {
+	if (window.__pendingRequests !== undefined) return;
+	window.__pendingRequests = 0;
+	var done = function () { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); };
+	var fetch = window.fetch;
+	if (fetch) {
+		window.fetch = function () {
+			window.__pendingRequests++;
+			return fetch.apply(this, arguments).then(
+				function (response) { done(); return response; },
+				function (error) { done(); throw error; }
+			);
+		};
+	}
+	var send = XMLHttpRequest.prototype.send;
+	XMLHttpRequest.prototype.send = function () {
+		window.__pendingRequests++;
+		this.addEventListener("loadend", done);
+		return send.apply(this, arguments);
+	};
+})();
+"""
+
+NETWORK_STATE = """
+return [
+	window.__pendingRequests === undefined ? -1 : window.__pendingRequests,
+	performance.getEntriesByType('resource').length,
+	document.readyState
+];
+"""
+
+def install_network_tracker(driver):
+	"""Injects the in-flight request counter into every document the driver loads."""
+	try:
+		driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER})
+	except WebDriverException as e:
+		print(f"Network tracker not installed, idle waits fall back to resource timing: {e}")
+	# The page that is already open doesn't run scripts registered after it loaded
+	try:
+		driver.execute_script(NETWORK_TRACKER)
+	except WebDriverException as e:
+		print(f"Network tracker not injected in the current page: {e}")
+
+def _locator(selector):
+	return selector if isinstance(selector, tuple) else (By.CSS_SELECTOR, selector)
+
+def wait_for_dom_ready(driver, timeout=BROWSER_WAIT_TIMEOUT):
+	WebDriverWait(driver, timeout, poll_frequency=BROWSER_POLL_INTERVAL).until(
+		lambda d: d.execute_script("return document.readyState") == "complete"
+	)
+
+def wait_for_network_idle(driver, idle_time=BROWSER_IDLE_TIME, timeout=BROWSER_WAIT_TIMEOUT):
+	"""Waits until no request is in flight and no resource finished loading for idle_time.
+	Returns: True once idle, False if the page was still busy at the timeout."""
+	deadline = time.monotonic() + timeout
+	last_state = None
+	quiet_since = time.monotonic()
+	while time.monotonic() < deadline:
+		try:
+			pending, resources, ready_state = driver.execute_script(NETWORK_STATE)
+		except WebDriverException:
+			# Navigation in progress, the old document is gone
+			pending, resources, ready_state = None, None, "loading"
+		state = (pending, resources, ready_state)
+		# pending is -1 without the tracker: then only resources and readyState tell idleness
+		if state != last_state or (pending or 0) > 0 or ready_state != "complete":
+			last_state = state
+			quiet_since = time.monotonic()
+		elif time.monotonic() - quiet_since >= idle_time:
+			return True
+		time.sleep(BROWSER_POLL_INTERVAL)
+	return False
+
+def wait_for_selector(driver, selector, condition="visible", timeout=BROWSER_WAIT_TIMEOUT):
+	"""Waits for a CSS selector (or a (By, value) locator) to be present, visible or clickable.
+	Returns: The WebElement. Raises TimeoutException."""
+	return WebDriverWait(driver, timeout, poll_frequency=BROWSER_POLL_INTERVAL).until(
+		CONDITIONS[condition](_locator(selector))
+	)
+
+def wait_for_any(driver, selectors, timeout=BROWSER_WAIT_TIMEOUT):
+	"""Waits until one of the selectors matches an element.
+	Returns: The first selector that matched, or None at the timeout."""
+	try:
+		return WebDriverWait(driver, timeout, poll_frequency=BROWSER_POLL_INTERVAL).until(
+			lambda d: next((selector for selector in selectors if d.find_elements(*_locator(selector))), False)
+		)
+	except TimeoutException:
+		return None
+
+def wait_for_navigation(driver, old_page, timeout=BROWSER_WAIT_TIMEOUT):
+	"""Waits for the document of old_page (any element of it) to be replaced and the new one to settle."""
+	WebDriverWait(driver, timeout, poll_frequency=BROWSER_POLL_INTERVAL).until(EC.staleness_of(old_page))
+	wait_for_dom_ready(driver, timeout)
+	wait_for_network_idle(driver, timeout=timeout)
+
+def click_when_ready(driver, selector, timeout=BROWSER_WAIT_TIMEOUT):
+	"""Clicks an element as soon as it is clickable, through JavaScript if an overlay is in the way.
+	Returns: The clicked WebElement."""
+	element = wait_for_selector(driver, selector, "clickable", timeout)
+	try:
+		element.click()
+	except ElementClickInterceptedException:
+		driver.execute_script("arguments[0].click();", element)
+	return element
+
+class StepTimer:
+	"""Accumulates wall-clock time per named step of a scraping flow, across threads."""
+
+	def __init__(self, name):
+		self.name = name
+		self.steps = {}
+		self._lock = threading.Lock()
+
+	@contextmanager
+	def step(self, name):
+		start = time.monotonic()
+		try:
+			yield
+		finally:
+			elapsed = time.monotonic() - start
+			with self._lock:
+				count, total, longest = self.steps.get(name, (0, 0.0, 0.0))
+				self.steps[name] = (count + 1, total + elapsed, max(longest, elapsed))
+
+	def report(self):
+		print(f"{self.name} step timings:")
+		for name, (count, total, longest) in sorted(self.steps.items(), key=lambda item: -item[1][1]):
+			print(f"  {name:24} {count:5}x  total {total:8.1f}s  avg {total / count:6.2f}s  max {longest:6.2f}s")
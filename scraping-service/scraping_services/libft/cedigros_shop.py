@@ -0,0 +1,141 @@
+import os
+import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .http_client import get_client
+from .html_parsing import make_soup
+from .libft_gros import get_html_from_url, has_phone_number, has_superficie, geocode
+from .libft_utility import write_list_of_dicts_to_csv
+from .send_data import create_store, create_stores
+
+# Shared store pipeline for the banners listed on cedigros.com (dem, effepiu, idromarket, ...).
+# Store pages are downloaded concurrently, parsed in a process pool, geocoded in batches
+# and sent to the receiver in one bulk request. A store that fails at any step is
+# recorded and skipped instead of aborting the whole banner.
+
+HEADERS = {"Accept": "*/*"}
+SHOP_FETCH_WORKERS = int(os.getenv("SHOP_FETCH_WORKERS", 8))
+SHOP_PARSE_WORKERS = int(os.getenv("SHOP_PARSE_WORKERS", os.cpu_count() or 1))
+GEOCODE_BATCH_SIZE = int(os.getenv("GEOCODE_BATCH_SIZE", 10))
+
+def list_store_urls(listing_url):
+	"""Returns the unique store page URLs linked from a cedigros listing."""
+	response = get_html_from_url(listing_url, headers=HEADERS)
+	soup = make_soup(response.text)
+	return sorted({f"https://www.cedigros.com{link['href']}" for link in soup.find_all('a', href=True)})
+
+def fetch_store_page(url):
+	"""Returns (url, html, error) so failures travel with the store they belong to."""
+	try:
+		response = get_client().get(url, headers=HEADERS)
+		if response.status_code != 200:
+			return url, None, f"HTTP {response.status_code}"
+		return url, response.text, None
+	except requests.exceptions.RequestException as e:
+		return url, None, str(e)
+
+# Extracts address, city and working hours from a cedigros store page.
+# Runs in a worker process, so it only takes and returns plain data.
+# Returns: (store dict, None) on success, (None, error message) otherwise
+
+def parse_store_page(html):
+	soup = make_soup(html)
+
+	try:
+		div = soup.find('div', class_="fwTableCell span_7 fwPad1x mainInfos")
+		div_info = div.find('h3', class_="tpl-ItemTitle text-left itemAnim")
+		address = (div_info.find('small')).get_text()
+		parts = div_info.contents
+		city_name = parts[0].strip()
+
+		if "GPS" in city_name:
+			city_name = city_name.replace("GPS", "").strip()
+	except (AttributeError, IndexError, TypeError):
+		return None, "No location information found"
+
+	try:
+		div = soup.find('div', class_="fwPad1x itemAnim")
+		div_info = div.find_all('span', style="float:left; min-height:1.2em; line-height:1.2em")
+		working_hours = []
+
+		for div_call in div_info:
+			if not (has_phone_number((div_call).get_text()) | has_superficie((div_call).get_text())):
+				working_hours.append(div_call.get_text())
+	except (AttributeError, TypeError):
+		return None, "No working hours information found"
+
+	if not city_name:
+		return None, "Empty city name"
+
+	return {"street": address, "city": city_name, "working_hours": f"{working_hours}"}, None
+
+def geocode_store(store):
+	"""Returns (lat, lng, postal_code, error) for a parsed store."""
+	try:
+		lat, lng, city, postal_code = geocode({store["city"], store["street"]})
+	except (ValueError, RuntimeError) as e:
+		return None, None, None, str(e)
+	if not lat or not lng:
+		return None, None, None, "Geocoding failed"
+	return lat, lng, postal_code, None
+
+def upsert_stores(shop_list, csv_name):
+	"""Sends the stores in bulk; stores the receiver didn't take end up in the CSV backup."""
+	if not shop_list:
+		return
+	status = create_stores(shop_list)
+	if status == 200:
+		return
+	# Receivers without insertMany, or a failed batch: fall back to one request per store
+	not_created = [shop_info for shop_info in shop_list if create_store(shop_info) is None]
+	if not_created:
+		write_list_of_dicts_to_csv(not_created, csv_name)
+
+def scrape_cedigros_banner(shop_name, listing_url, csv_name=None):
+	"""Scrapes, geocodes and upserts every store of a cedigros banner.
+	Returns: The list of (url, reason) for the stores that were skipped."""
+	csv_name = csv_name or f"{shop_name}_shop.csv"
+	failures = []
+
+	url_shop_list_unique = list_store_urls(listing_url)
+
+	with ThreadPoolExecutor(max_workers=SHOP_FETCH_WORKERS) as executor:
+		pages = list(executor.map(fetch_store_page, url_shop_list_unique))
+	failures.extend((url, error) for url, _, error in pages if error)
+	pages = [(url, html) for url, html, error in pages if not error]
+
+	with ProcessPoolExecutor(max_workers=SHOP_PARSE_WORKERS) as executor:
+		parsed = list(executor.map(parse_store_page, [html for _, html in pages]))
+
+	stores = []
+	for (url, _), (store, error) in zip(pages, parsed):
+		if error:
+			failures.append((url, error))
+		else:
+			stores.append((url, store))
+
+	shop_list = []
+	with ThreadPoolExecutor(max_workers=GEOCODE_BATCH_SIZE) as executor:
+		for start in range(0, len(stores), GEOCODE_BATCH_SIZE):
+			batch = stores[start:start + GEOCODE_BATCH_SIZE]
+			for (url, store), (lat, lng, postal_code, error) in zip(batch, executor.map(geocode_store, [store for _, store in batch])):
+				if error:
+					failures.append((url, error))
+					continue
+				shop_list.append({
+					"name": shop_name,
+					"street": store["street"],
+					"lat": lat,
+					"long": lng,
+					"city": store["city"],
+					"working_hours": store["working_hours"],
+					"picks_up_in_shop": "True",
+					"zip_code": postal_code,
+				})
+
+	upsert_stores(shop_list, csv_name)
+
+	print(f"{shop_name}: {len(shop_list)} stores processed, {len(failures)} skipped")
+	for url, error in failures:
+		print(f"Skipped {url}: {error}")
+	return failures
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from .crawl_state import CRAWL_STATE_DIR
+from .send_data import resend_products
+
+# Checkpoints of a crawl, so a crashed run can be resumed instead of started over.
+# It records every (shop, category, page) whose products reached the receiver, and every batch
+# of products that is about to be sent: a batch is stored before sending and removed once it
+# arrived (by commit_page together with marking the page done, by ProductFanOut on its own), so
+# after a crash the batches still stored are exactly the ones that may not have arrived.
+# Every run sends those again first (the receiver upserts, so a duplicate is harmless): a resumed
+# run then skips the completed pages, a normal run forgets them and crawls everything, but never
+# drops the pending batches, since the crawl state may already count their products as sent.
+# A whole category is recorded with page CATEGORY_DONE.
+
+CATEGORY_DONE = -1
+
+class Checkpoint:
+	"""SQLite-backed, thread-safe record of completed pages and pending send batches."""
+
+	def __init__(self, name, resume=False, state_dir=CRAWL_STATE_DIR):
+		os.makedirs(state_dir, exist_ok=True)
+		self.path = os.path.join(state_dir, f"{name}_checkpoint.sqlite")
+		self.resume = resume
+		self._lock = threading.Lock()
+		self.connection = sqlite3.connect(self.path, check_same_thread=False)
+		self.connection.executescript("""
+			CREATE TABLE IF NOT EXISTS completed (
+				shop TEXT NOT NULL,
+				category TEXT NOT NULL,
+				page INTEGER NOT NULL,
+				items INTEGER NOT NULL,
+				done_at REAL NOT NULL,
+				PRIMARY KEY (shop, category, page)
+			);
+			CREATE TABLE IF NOT EXISTS pending_batches (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				documents TEXT NOT NULL,
+				created_at REAL NOT NULL
+			);
+		""")
+		if not resume:
+			self.connection.execute("DELETE FROM completed")
+			pending = self.connection.execute("SELECT COUNT(*) FROM pending_batches").fetchone()[0]
+			if pending:
+				print(f"Keeping {pending} batches left pending by an interrupted run, replay_pending sends them")
+		self.connection.commit()
+
+	def is_done(self, shop, category, page=CATEGORY_DONE):
+		with self._lock:
+			row = self.connection.execute(
+				"SELECT 1 FROM completed WHERE shop = ? AND category = ? AND page = ?",
+				(str(shop), str(category), page),
+			).fetchone()
+		return row is not None
+
+	def mark_done(self, shop, category, page=CATEGORY_DONE, items=0):
+		with self._lock:
+			self._mark_done(shop, category, page, items)
+			self.connection.commit()
+
+	def _mark_done(self, shop, category, page, items):
+		self.connection.execute(
+			"INSERT OR REPLACE INTO completed VALUES (?, ?, ?, ?, ?)",
+			(str(shop), str(category), page, items, time.time()),
+		)
+
+	def add_pending(self, documents):
+		"""Stores a batch about to be sent. Returns: The batch id."""
+		with self._lock:
+			cursor = self.connection.execute(
+				"INSERT INTO pending_batches (documents, created_at) VALUES (?, ?)",
+				(json.dumps(documents, default=str), time.time()),
+			)
+			self.connection.commit()
+			return cursor.lastrowid
+
+	def remove_pending(self, batch_id):
+		with self._lock:
+			self.connection.execute("DELETE FROM pending_batches WHERE id = ?", (batch_id,))
+			self.connection.commit()
+
+	def commit_page(self, shop, category, page, documents, send):
+		"""Sends a page's documents one by one through send, which returns the HTTP status.
+		The documents the receiver refused stay pending for the next resumed run.
+		Returns: The number of documents sent."""
+		batch_id = self.add_pending(documents)
+		failed = [document for document in documents if send(document) != 200]
+		with self._lock:
+			self.connection.execute("DELETE FROM pending_batches WHERE id = ?", (batch_id,))
+			if failed:
+				self.connection.execute(
+					"INSERT INTO pending_batches (documents, created_at) VALUES (?, ?)",
+					(json.dumps(failed, default=str), time.time()),
+				)
+			self._mark_done(shop, category, page, len(documents) - len(failed))
+			self.connection.commit()
+		return len(documents) - len(failed)
+
+	def pending_batches(self):
+		"""Returns: [(batch id, documents)] left over by an interrupted run, oldest first."""
+		with self._lock:
+			rows = self.connection.execute("SELECT id, documents FROM pending_batches ORDER BY id").fetchall()
+		return [(batch_id, json.loads(documents)) for batch_id, documents in rows]
+
+	def replay_pending(self, send_batch=resend_products):
+		"""Sends the leftover batches again through send_batch(documents), which returns True on success.
+		Returns: The number of documents replayed."""
+		replayed = 0
+		for batch_id, documents in self.pending_batches():
+			if send_batch(documents):
+				self.remove_pending(batch_id)
+				replayed += len(documents)
+		if replayed:
+			print(f"Resent {replayed} products left pending by the previous run")
+		return replayed
+
+	def close(self):
+		with self._lock:
+			self.connection.commit()
+			self.connection.close()
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Local change-detection store for incremental crawls.
+# For each category it remembers the fingerprint of every page and the hash of every product
+# it emitted, so a nightly run can skip categories whose first page did not change and only
+# send downstream the products whose content did. Nothing of a category is recorded until the
+# receiver has accepted all the products sent for it (see CategoryUpdate), so a failed send is
+# retried by the next run instead of being skipped as unchanged.
+
+CRAWL_STATE_DIR = os.getenv("CRAWL_STATE_DIR", "state")
+# Past this age a stored fingerprint or hash no longer counts as "unchanged", which bounds how
+# long a change hidden behind an identical first page can go unnoticed.
+CRAWL_STATE_MAX_AGE = float(os.getenv("CRAWL_STATE_MAX_AGE", 7 * 24 * 60 * 60))
+
+def product_hash(product_data):
+	"""Stable hash of everything the receiver stores for a product."""
+	return hashlib.sha1(json.dumps(product_data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def page_fingerprint(hashes, extra=None):
+	"""Fingerprint of a page from the hashes of its products, in page order."""
+	digest = hashlib.sha1()
+	if extra is not None:
+		digest.update(json.dumps(extra, sort_keys=True, default=str).encode("utf-8"))
+	for value in hashes:
+		digest.update(value.encode("utf-8"))
+	return digest.hexdigest()
+
+class CrawlState:
+	"""SQLite-backed, thread-safe page fingerprints and product hashes, keyed by category."""
+
+	def __init__(self, name, state_dir=CRAWL_STATE_DIR, max_age=CRAWL_STATE_MAX_AGE):
+		os.makedirs(state_dir, exist_ok=True)
+		self.path = os.path.join(state_dir, f"{name}.sqlite")
+		self.max_age = max_age
+		self._lock = threading.Lock()
+		self.connection = sqlite3.connect(self.path, check_same_thread=False)
+		self.connection.executescript("""
+			CREATE TABLE IF NOT EXISTS page_fingerprints (
+				category_id TEXT NOT NULL,
+				page INTEGER NOT NULL,
+				fingerprint TEXT NOT NULL,
+				updated_at REAL NOT NULL,
+				PRIMARY KEY (category_id, page)
+			);
+			CREATE TABLE IF NOT EXISTS product_hashes (
+				category_id TEXT NOT NULL,
+				product_key TEXT NOT NULL,
+				hash TEXT NOT NULL,
+				updated_at REAL NOT NULL,
+				PRIMARY KEY (category_id, product_key)
+			);
+		""")
+
+	def _is_fresh(self, updated_at):
+		return time.time() - updated_at < self.max_age
+
+	def page_unchanged(self, category_id, page, fingerprint):
+		with self._lock:
+			row = self.connection.execute(
+				"SELECT fingerprint, updated_at FROM page_fingerprints WHERE category_id = ? AND page = ?",
+				(str(category_id), page),
+			).fetchone()
+		return row is not None and row[0] == fingerprint and self._is_fresh(row[1])
+
+	def changed_products(self, category_id, keyed_products):
+		"""Filters (key, hash, product_data) tuples down to the products whose hash changed.
+		Returns: The changed tuples; nothing is recorded until record() is called with them."""
+		category_id = str(category_id)
+		changed = []
+		with self._lock:
+			for key, value, product_data in keyed_products:
+				row = self.connection.execute(
+					"SELECT hash, updated_at FROM product_hashes WHERE category_id = ? AND product_key = ?",
+					(category_id, str(key)),
+				).fetchone()
+				if row is None or row[0] != value or not self._is_fresh(row[1]):
+					changed.append((key, value, product_data))
+		return changed
+
+	def record(self, category_id, pages, keyed_products):
+		"""Stores the (page, fingerprint) pairs and the hashes of the (key, hash, product_data)
+		tuples of a category in one transaction."""
+		category_id = str(category_id)
+		now = time.time()
+		with self._lock:
+			self.connection.executemany(
+				"INSERT OR REPLACE INTO page_fingerprints VALUES (?, ?, ?, ?)",
+				[(category_id, page, fingerprint, now) for page, fingerprint in pages],
+			)
+			self.connection.executemany(
+				"INSERT OR REPLACE INTO product_hashes VALUES (?, ?, ?, ?)",
+				[(category_id, str(key), value, now) for key, value, _ in keyed_products],
+			)
+			self.connection.commit()
+
+	def close(self):
+		with self._lock:
+			self.connection.commit()
+			self.connection.close()
+
+class CategoryUpdate:
+	"""The crawl-state changes of one category, held back until the receiver has its products.
+	The crawler stages every page it sends, the fan-out settles every product once its batch is
+	done and close() tells the crawl of the category is over. A single refused batch and nothing
+	is recorded, so the next run sends the whole category again."""
+
+	def __init__(self, state, category_id):
+		self.state = state
+		self.category_id = category_id
+		self.pages = []
+		self.products = []
+		self.outstanding = 0
+		self.failed = False
+		self.closed = False
+		self._lock = threading.Lock()
+
+	def stage(self, page, fingerprint, keyed_products):
+		with self._lock:
+			self.pages.append((page, fingerprint))
+			self.products.extend(keyed_products)
+			self.outstanding += len(keyed_products)
+
+	def settle(self, sent):
+		"""Called by the fan-out for each staged product, with whether its batch was sent."""
+		with self._lock:
+			self.outstanding -= 1
+			if not sent and not self.failed:
+				self.failed = True
+				print(f"Category {self.category_id}: products not accepted by the receiver, crawl state left unchanged")
+			ready = self._ready()
+		if ready:
+			self.state.record(self.category_id, self.pages, self.products)
+
+	def close(self):
+		with self._lock:
+			self.closed = True
+			ready = self._ready()
+		if ready:
+			self.state.record(self.category_id, self.pages, self.products)
+
+	def _ready(self):
+		return self.closed and self.outstanding == 0 and not self.failed
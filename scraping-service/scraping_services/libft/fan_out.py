@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+
+from .send_data import ProductSender
+
+# Batches products that must be published for every shop of a banner.
+# Each product is buffered once with the banner's shops attached as "localizations", the compact
+# form kept in the checkpoint and the spool too. ProductSender expands it into the usual one
+# document per shop right before sending, so the collection keeps its shape and a batch takes a
+# few insertMany requests instead of one insertOne per (product, shop).
+# With a checkpoint (see checkpoint.py), every batch is stored there before it is sent and
+# removed once the receiver took it; what is left is sent again by the next run.
+# With a spool (see spool.py), batches are appended to it and the drain sends them; a batch in
+# the spool counts as sent.
+
+FAN_OUT_BATCH_SIZE = int(os.getenv("FAN_OUT_BATCH_SIZE", 200))
+FAN_OUT_FLUSH_INTERVAL = float(os.getenv("FAN_OUT_FLUSH_INTERVAL", 5))
+
+# Reduces a shop list to the fields the receiver stores as a product localization.
+# Returns: A list of localization dicts, shared by every product of the banner
+
+def compact_localizations(shop_list):
+	return [
+		{
+			"grocery": shop.get('name'),
+			"lat": shop.get('lat'),
+			"lng": shop.get('lng'),
+			"street": shop.get('street'),
+		}
+		for shop in shop_list
+	]
+
+class ProductFanOut:
+	"""Thread-safe buffer sending products in bulk, flushed by size or by age."""
+
+	def __init__(self, localizations, batch_size=FAN_OUT_BATCH_SIZE, flush_interval=FAN_OUT_FLUSH_INTERVAL, checkpoint=None, spool=None):
+		self.localizations = localizations
+		self.checkpoint = checkpoint
+		self.spool = spool
+		self.batch_size = batch_size
+		self.flush_interval = flush_interval
+		self.sent_products = 0
+		self.sent_batches = 0
+		self.failed_batches = 0
+		self._buffer = []
+		self._lock = threading.Lock()
+		self._last_flush = time.monotonic()
+		self._sender = ProductSender()
+		self._stopped = threading.Event()
+		self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+		self._flusher.start()
+
+	def add(self, product_data, receipt=None):
+		self.extend([product_data], receipt)
+
+	def extend(self, products, receipt=None):
+		"""Buffers products for sending. receipt.settle(sent) is called for each of them once
+		its batch is done (see CategoryUpdate in crawl_state.py)."""
+		batches = []
+		with self._lock:
+			for product_data in products:
+				document = dict(product_data)
+				document["localizations"] = self.localizations
+				self._buffer.append((document, receipt))
+				if len(self._buffer) >= self.batch_size:
+					batches.append(self._take_buffer())
+		for batch in batches:
+			self._send(batch)
+
+	def flush(self):
+		with self._lock:
+			batch = self._take_buffer()
+		if batch:
+			self._send(batch)
+
+	def close(self):
+		self._stopped.set()
+		self._flusher.join()
+		self.flush()
+		print(f"Fan-out sent {self.sent_products} products in {self.sent_batches} batches, {self.failed_batches} failed")
+
+	def _take_buffer(self):
+		batch = self._buffer
+		self._buffer = []
+		self._last_flush = time.monotonic()
+		return batch
+
+	def _flush_periodically(self):
+		while not self._stopped.wait(self.flush_interval):
+			with self._lock:
+				stale = self._buffer and time.monotonic() - self._last_flush >= self.flush_interval
+				batch = self._take_buffer() if stale else None
+			if batch:
+				self._send(batch)
+
+	def _send(self, entries):
+		batch = [document for document, _ in entries]
+		# Stored before sending, so a crash mid-send leaves it pending for the next run
+		batch_id = self.checkpoint.add_pending(batch) if self.checkpoint is not None else None
+		sent = self.send_batch(batch)
+		if sent and batch_id is not None:
+			self.checkpoint.remove_pending(batch_id)
+		for _, receipt in entries:
+			if receipt is not None:
+				receipt.settle(sent)
+
+	def send_batch(self, batch):
+		"""Sends a batch of documents with their localizations. Returns: True if it was sent."""
+		if self.spool is not None:
+			self.spool.extend(batch)
+			self.sent_products += len(batch)
+			self.sent_batches += 1
+			return True
+		if self._sender.send(batch) != 200:
+			# The whole batch is sent again on resume, the receiver upserts the ones that arrived
+			self.failed_batches += 1
+			return False
+		self.sent_products += len(batch)
+		self.sent_batches += 1
+		return True
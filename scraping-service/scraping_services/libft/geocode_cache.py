@@ -0,0 +1,123 @@
+import os
+import re
+import time
+import json
+import sqlite3
+import threading
+
+from .crawl_state import CRAWL_STATE_DIR
+from .libft_utility import read_csv_to_list_of_dicts
+
+# Persistent cache in front of the Google Geocoding API.
+# Shop addresses almost never change, so results are kept for GEOCODE_CACHE_TTL. Addresses the
+# API could not resolve are remembered for the shorter GEOCODE_NEGATIVE_TTL so a bad address
+# doesn't cost a request on every run, while still being retried eventually.
+# scraping_shop/warm_geocode_cache.py fills it from the CSV backups of the shop scrapers.
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", os.path.join(CRAWL_STATE_DIR, "geocode_cache.sqlite"))
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", 180 * 24 * 60 * 60))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", 7 * 24 * 60 * 60))
+
+# Turns whatever the scrapers pass to geocode (a string, or a set like {city_name, address})
+# into a stable cache key: parts sorted, lower-cased, punctuation and extra spaces dropped.
+# Returns: The normalized address string
+
+def normalize_address(address):
+	if isinstance(address, (set, frozenset, list, tuple)):
+		parts = [str(part) for part in address if part]
+	else:
+		parts = [str(address)]
+	normalized = []
+	for part in parts:
+		part = part.casefold()
+		part = re.sub(r"[^\w\s]", " ", part)
+		part = re.sub(r"\s+", " ", part).strip()
+		if part:
+			normalized.append(part)
+	return " | ".join(sorted(normalized))
+
+class GeocodeCache:
+	"""SQLite map from normalized address to (lat, lng, city, postal_code) or a failure."""
+
+	def __init__(self, path=GEOCODE_CACHE_PATH, ttl=GEOCODE_CACHE_TTL, negative_ttl=GEOCODE_NEGATIVE_TTL):
+		os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		self.ttl = ttl
+		self.negative_ttl = negative_ttl
+		self.hits = 0
+		self.misses = 0
+		self._lock = threading.Lock()
+		self.connection = sqlite3.connect(path, check_same_thread=False)
+		self.connection.execute("""
+			CREATE TABLE IF NOT EXISTS geocode (
+				address TEXT PRIMARY KEY,
+				result TEXT,
+				error TEXT,
+				updated_at REAL NOT NULL
+			)
+		""")
+		self.connection.commit()
+
+	def get(self, address):
+		"""Returns ("ok", result), ("error", message), or None on a miss or an expired entry."""
+		with self._lock:
+			row = self.connection.execute(
+				"SELECT result, error, updated_at FROM geocode WHERE address = ?",
+				(normalize_address(address),),
+			).fetchone()
+			age = time.time() - row[2] if row else None
+			if row is None or (row[1] is None and age >= self.ttl) or (row[1] is not None and age >= self.negative_ttl):
+				self.misses += 1
+				return None
+			self.hits += 1
+			if row[1] is not None:
+				return "error", row[1]
+			return "ok", tuple(json.loads(row[0]))
+
+	def put(self, address, result):
+		self._store(normalize_address(address), json.dumps(list(result)), None)
+
+	def put_error(self, address, message):
+		self._store(normalize_address(address), None, message)
+
+	def _store(self, key, result, error):
+		with self._lock:
+			self.connection.execute(
+				"INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)",
+				(key, result, error, time.time()),
+			)
+			self.connection.commit()
+
+	def warm_from_csv(self, filename):
+		"""Seeds the cache with the coordinates already stored in a *_shop.csv backup.
+		Returns: The number of rows imported."""
+		rows = read_csv_to_list_of_dicts(filename) or []
+		imported = 0
+		for row in rows:
+			street = row.get("street")
+			lat = row.get("lat")
+			lng = row.get("lng") or row.get("long")
+			if not street or not lat or not lng:
+				continue
+			try:
+				coordinates = (float(lat), float(lng))
+			except ValueError:
+				print(f"Skipping {street} in {filename}: invalid coordinates {lat}, {lng}")
+				continue
+			result = coordinates + (row.get("city") or None, row.get("zip_code") or None)
+			# The shop scrapers geocode either the street alone or {city, street}
+			self.put({street}, result)
+			if row.get("city"):
+				self.put({row["city"], street}, result)
+			imported += 1
+		return imported
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_geocode_cache():
+	"""Returns the process-wide GeocodeCache, opening it on first use."""
+	global _cache
+	with _cache_lock:
+		if _cache is None:
+			_cache = GeocodeCache()
+		return _cache
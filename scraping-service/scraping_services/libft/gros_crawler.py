@@ -0,0 +1,345 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import aiohttp
+
+from .libft_utility import extract_micro_categories, read_csv_to_list_of_dicts
+from .send_data import get_store_by_grocery_and_city
+from .fan_out import ProductFanOut, compact_localizations
+from .crawl_state import CrawlState, CategoryUpdate, CRAWL_STATE_DIR, product_hash, page_fingerprint
+from .checkpoint import Checkpoint
+from .spool import SCRAPER_SPOOL, get_spool
+
+# Shared crawler for the Gros-group banners (cts, dem, effepiu, ...).
+# Every banner runs the same ebsn storefront, so a banner is fully described by:
+#   {"name": "cts", "base_url": "https://www.ctsspesaonline.it", "shop_csv": "cts_shop.csv"}
+
+HEADERS = {"Accept": "*/*"}
+MAX_PAGES = 1000
+PAGE_SIZE = 24
+# Largest page_size asked to the ebsn API; the crawler settles on the biggest one the server honours
+GROS_MAX_PAGE_SIZE = int(os.getenv("GROS_MAX_PAGE_SIZE", 200))
+PAGE_SIZE_CANDIDATES = sorted({size for size in (GROS_MAX_PAGE_SIZE, 100, 48) if size <= GROS_MAX_PAGE_SIZE} | {PAGE_SIZE}, reverse=True)
+ALLOWED_KEYWORDS = ["ITALIA", "SCOTTONA", "ALLEVATO"]
+
+GROS_CONCURRENCY = int(os.getenv("GROS_CONCURRENCY", 8))
+GROS_REQUEST_TIMEOUT = int(os.getenv("GROS_REQUEST_TIMEOUT", 30))
+# Skip unchanged categories and products using the banner's local crawl state, 0 for a full run
+GROS_INCREMENTAL = os.getenv("GROS_INCREMENTAL", "1") == "1"
+# Seconds a cached category tree is used without asking the server
+GROS_CATEGORY_TTL = float(os.getenv("GROS_CATEGORY_TTL", 24 * 60 * 60))
+
+# Fetches the "data" member of an ebsn API response, holding the host semaphore while in flight.
+# Returns: The parsed data if successful, otherwise None
+
+async def fetch_data_async(session, semaphore, url):
+	async with semaphore:
+		async with session.get(url, headers=HEADERS) as response:
+			if response.status != 200:
+				print(f"Error: {response.status} for {url}")
+				return None
+			payload = await response.json(content_type=None)
+			return payload.get("data")
+
+# Builds the receiver payload for a single ebsn product, without localization.
+# Returns: The product dict, or None if a required field is missing
+
+def build_product_data(product, base_url):
+	product_data = {
+		"name": product.get('name'),
+		"full_name": product.get('name'),
+		"img_url": f"{base_url}{product.get('mediaURLMedium', '')}",
+		"quantity": product.get('description'),
+		"price": product.get('price'),
+	}
+	if product['priceDisplay'] != product['price']:
+		product_data["discounted_price"] = product['priceDisplay']
+
+	product_infos = product.get("productInfos", {})
+
+	if product_data["quantity"] == "":
+		try:
+			product_data["quantity"] = f"{product_infos['WEIGHT_SELLING']}{product_infos['WEIGHT_UNIT_SELLING']}"
+		except:
+			product_data["quantity"] = f"1 {product['priceUnitDisplay']}"
+	else:
+		try:
+			product_data["price_for_kg"] = product['priceUmDisplay']
+		except:
+			product_data["price_for_kg"] = product['priceDisplay']
+
+	if any(keyword in product_data['quantity'] for keyword in ALLOWED_KEYWORDS) and not re.search(r'\d', product_data['quantity']):
+		if "ITALIA" in product_data['quantity'] or "ALLEVATO" in product_data['quantity']:
+			product_data['quantity'] = f"{product_infos.get('WEIGHT_SELLING')}{product_infos.get('WEIGHT_UNIT_SELLING')}"
+			product_data['description'] = product.get('description')
+		if "SCOTTONA" in product_data['quantity']:
+			product_data['quantity'] = f"{product_infos.get('WEIGHT_SELLING')}{product_infos.get('WEIGHT_UNIT_SELLING')}"
+			product_data['description'] = product.get('shortDescr')
+			product_data['full_name'] = f"{product.get('name')} {product.get('description')}"
+
+	if not product_data.get('full_name') or not product_data.get('name') or not product_data.get('price'):
+		return None
+
+	return product_data
+
+def read_category_cache(path):
+	try:
+		with open(path, "r", encoding="utf-8") as file:
+			return json.load(file)
+	except (FileNotFoundError, json.JSONDecodeError):
+		return None
+
+def write_category_cache(path, cache):
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	tmp_path = f"{path}.tmp"
+	with open(tmp_path, "w", encoding="utf-8") as file:
+		json.dump(cache, file)
+	os.replace(tmp_path, path)
+
+# Returns the banner's flattened micro categories, from the on-disk cache when possible.
+# A cache younger than GROS_CATEGORY_TTL is used as is; an older one is revalidated with
+# If-None-Match/If-Modified-Since and reused without parsing when the server answers 304,
+# and also when the server errors or can't be reached.
+# Returns: A list of {"categoryId", "name"} dicts, or None if the tree can't be fetched
+
+async def load_micro_categories(session, semaphore, banner):
+	cache_path = os.path.join(CRAWL_STATE_DIR, f"{banner['name']}_categories.json")
+	cache = read_category_cache(cache_path)
+	if cache and time.time() - cache["fetched_at"] < GROS_CATEGORY_TTL:
+		return cache["micro_categories"]
+
+	headers = dict(HEADERS)
+	if cache and cache.get("etag"):
+		headers["If-None-Match"] = cache["etag"]
+	if cache and cache.get("last_modified"):
+		headers["If-Modified-Since"] = cache["last_modified"]
+
+	categories_url = f"{banner['base_url']}/ebsn/api/category?filtered=false&hash=w0d0t0"
+	try:
+		async with semaphore:
+			async with session.get(categories_url, headers=headers) as response:
+				if response.status == 304 and cache:
+					cache["fetched_at"] = time.time()
+					write_category_cache(cache_path, cache)
+					return cache["micro_categories"]
+				if response.status != 200:
+					print(f"Error: {response.status} for {categories_url}")
+					return cache["micro_categories"] if cache else None
+				payload = await response.json(content_type=None)
+				etag = response.headers.get("ETag")
+				last_modified = response.headers.get("Last-Modified")
+	except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+		# A stale tree is better than no crawl when the server is unreachable
+		print(f"Error fetching categories from {categories_url}: {e}")
+		return cache["micro_categories"] if cache else None
+
+	micro_categories = [
+		{"categoryId": category["categoryId"], "name": category.get("name")}
+		for category in extract_micro_categories(payload.get("data"))
+	]
+	write_category_cache(cache_path, {
+		"fetched_at": time.time(),
+		"etag": etag,
+		"last_modified": last_modified,
+		"micro_categories": micro_categories,
+	})
+	return micro_categories
+
+def get_shop_list(banner):
+	"""Returns the banner's shops from the receiver, falling back to the local CSV."""
+	shop_list = get_store_by_grocery_and_city(banner["name"], "Roma")
+	if shop_list is None:
+		shop_list = read_csv_to_list_of_dicts(banner["shop_csv"])
+	return shop_list or []
+
+async def fetch_page(session, semaphore, base_url, category_id, page, page_size):
+	products_url = f"{base_url}/ebsn/api/products?parent_category_id={category_id}&page={page}&page_size={page_size}"
+	try:
+		return await fetch_data_async(session, semaphore, products_url)
+	except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+		print(f"Error fetching products from {products_url}: {e}")
+		return None
+
+# Reads the page count from the pagination block of an ebsn products response.
+# Returns: The number of pages, or None if the server didn't say
+
+def total_pages(fetched_products):
+	page_info = fetched_products.get("page") or {}
+	if page_info.get("totPages"):
+		return int(page_info["totPages"])
+	if page_info.get("totItems") is not None and page_info.get("itemsPerPage"):
+		return math.ceil(int(page_info["totItems"]) / int(page_info["itemsPerPage"]))
+	return None
+
+# Probes the first non-empty categories with decreasing page sizes.
+# Returns: The page size the server reports (itemsPerPage), or the first size it answered to
+
+async def discover_page_size(session, semaphore, banner, micro_categories):
+	for category in micro_categories[:5]:
+		for page_size in PAGE_SIZE_CANDIDATES:
+			fetched_products = await fetch_page(session, semaphore, banner["base_url"], category["categoryId"], 1, page_size)
+			if fetched_products is None:
+				continue
+			if not fetched_products.get("products"):
+				break
+			page_info = fetched_products.get("page") or {}
+			return int(page_info.get("itemsPerPage") or page_size)
+	return PAGE_SIZE
+
+# Turns one fetched page into products and hands the new or changed ones to the fan-out.
+# With a category update, the page and its changed products are staged there and recorded in
+# the crawl state once the fan-out has sent them.
+# Returns: (number of products emitted, whether the page was unchanged since the last run)
+
+async def process_page(banner, category_id, page, fetched_products, fan_out, update):
+	keyed_products = []
+	for product in fetched_products["products"]:
+		try:
+			product_data = build_product_data(product, banner["base_url"])
+		except (KeyError, TypeError) as e:
+			print(f"Error processing product {product.get('name', 'ID Missing')}: {e}")
+			continue
+		if product_data is not None:
+			product_key = product.get("productId") or product_data["full_name"]
+			keyed_products.append((product_key, product_hash(product_data), product_data))
+
+	if update is None:
+		page_products = [product_data for _, _, product_data in keyed_products]
+	else:
+		fingerprint = page_fingerprint((value for _, value, _ in keyed_products), fetched_products.get("page"))
+		if update.state.page_unchanged(category_id, page, fingerprint):
+			return 0, True
+		changed = update.state.changed_products(category_id, keyed_products)
+		update.stage(page, fingerprint, changed)
+		page_products = [product_data for _, _, product_data in changed]
+
+	# The fan-out may flush a batch to the receiver, keep it off the event loop
+	await asyncio.to_thread(fan_out.extend, page_products, update)
+	return len(page_products), False
+
+# Crawls a micro category. With a crawl state, a category whose first page is unchanged is
+# skipped, and what the crawl saw is recorded once the receiver has all of it: a category
+# that raised or lost a batch is crawled and sent again in full by the next run.
+# Returns: The number of products emitted for the category
+
+async def crawl_category(session, semaphore, banner, category, page_size, fan_out, state=None):
+	update = CategoryUpdate(state, category["categoryId"]) if state is not None else None
+	processed_items = await crawl_pages(session, semaphore, banner, category, page_size, fan_out, update)
+	if update is not None:
+		update.close()
+	return processed_items
+
+# The first page tells how many pages there are, the rest are fetched concurrently; without
+# pagination metadata pages are walked until an empty one.
+# Returns: The number of products emitted for the category
+
+async def crawl_pages(session, semaphore, banner, category, page_size, fan_out, update):
+	base_url = banner["base_url"]
+	category_id = category["categoryId"]
+
+	first_page = await fetch_page(session, semaphore, base_url, category_id, 1, page_size)
+	if not first_page or not first_page.get("products"):
+		return 0
+	processed_items, unchanged = await process_page(banner, category_id, 1, first_page, fan_out, update)
+	if unchanged:
+		print(f"Category {category_id} unchanged, skipping")
+		return 0
+
+	last_page = total_pages(first_page)
+	if last_page is not None:
+		pages = range(2, min(last_page, MAX_PAGES) + 1)
+		fetched_pages = await asyncio.gather(
+			*(fetch_page(session, semaphore, base_url, category_id, page, page_size) for page in pages)
+		)
+		for page, fetched_products in zip(pages, fetched_pages):
+			if fetched_products and fetched_products.get("products"):
+				emitted, _ = await process_page(banner, category_id, page, fetched_products, fan_out, update)
+				processed_items += emitted
+		return processed_items
+
+	page = 2
+	while page <= MAX_PAGES:
+		fetched_products = await fetch_page(session, semaphore, base_url, category_id, page, page_size)
+		if not fetched_products or not fetched_products.get("products"):
+			break
+		emitted, _ = await process_page(banner, category_id, page, fetched_products, fan_out, update)
+		processed_items += emitted
+		page += 1
+	return processed_items
+
+# The checkpoint of a banner records each category once all its products have been handed
+# to the receiver. Every run first sends the batches left pending; a resumed run then crawls the
+# other categories in full, since their crawl state may hold products that never reached the receiver.
+
+async def crawl_category_checkpointed(session, semaphore, banner, category, page_size, fan_out, state, checkpoint):
+	processed_items = await crawl_category(session, semaphore, banner, category, page_size, fan_out, state)
+	await asyncio.to_thread(fan_out.flush)
+	checkpoint.mark_done(banner["name"], category["categoryId"], items=processed_items)
+	return processed_items
+
+async def crawl_banner(banner, concurrency=GROS_CONCURRENCY, resume=False):
+	"""Crawls every micro category of a banner over one pooled session."""
+	semaphore = asyncio.Semaphore(concurrency)
+	connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+	timeout = aiohttp.ClientTimeout(total=GROS_REQUEST_TIMEOUT)
+
+	request_count = {"requests": 0}
+	async def count_request(session, context, params):
+		request_count["requests"] += 1
+	trace_config = aiohttp.TraceConfig()
+	trace_config.on_request_start.append(count_request)
+
+	async with aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[trace_config]) as session:
+		micro_categories = await load_micro_categories(session, semaphore, banner)
+		if micro_categories is None:
+			print(f"Unable to fetch categories for {banner['name']}")
+			return 0
+		page_size = await discover_page_size(session, semaphore, banner, micro_categories)
+		shop_list = await asyncio.to_thread(get_shop_list, banner)
+		checkpoint = Checkpoint(banner["name"], resume=resume)
+		fan_out = ProductFanOut(compact_localizations(shop_list), checkpoint=checkpoint, spool=get_spool() if SCRAPER_SPOOL else None)
+		state = CrawlState(banner["name"]) if GROS_INCREMENTAL and not resume else None
+
+		await asyncio.to_thread(checkpoint.replay_pending, fan_out.send_batch)
+		if resume:
+			done = [category for category in micro_categories if checkpoint.is_done(banner["name"], category["categoryId"])]
+			print(f"Resuming {banner['name']}: {len(done)} of {len(micro_categories)} categories already sent")
+			micro_categories = [category for category in micro_categories if category not in done]
+
+		try:
+			results = await asyncio.gather(
+				*(crawl_category_checkpointed(session, semaphore, banner, category, page_size, fan_out, state, checkpoint) for category in micro_categories),
+				return_exceptions=True,
+			)
+		finally:
+			await asyncio.to_thread(fan_out.close)
+			checkpoint.close()
+			if state is not None:
+				state.close()
+
+	print(f"{banner['name']}: {request_count['requests']} requests to the storefront with page_size={page_size}")
+	total_items_processed = 0
+	for category, result in zip(micro_categories, results):
+		if isinstance(result, Exception):
+			print(f"Error crawling category {category.get('categoryId')}: {result}")
+		else:
+			total_items_processed += result
+	return total_items_processed
+
+def run_gros_banner(banner):
+	"""Entry point used by the scraping_<banner>.py scripts."""
+	parser = argparse.ArgumentParser(description=f"Crawl the {banner['name']} catalogue.")
+	parser.add_argument("--resume", action="store_true", help="continue the interrupted run from its checkpoint")
+	args = parser.parse_args()
+	try:
+		total_items_processed = asyncio.run(crawl_banner(banner, resume=args.resume))
+	except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+		print(f"A top-level error occurred: {e}")
+		sys.exit(1)
+	print(f"Total items processed for {banner['name']}: {total_items_processed}")
+	return total_items_processed
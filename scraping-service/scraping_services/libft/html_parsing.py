@@ -0,0 +1,134 @@
+import os
+import re
+import soupsieve
+from bs4 import BeautifulSoup
+
+# Parsing layer for the HTML scrapers.
+# PARSER_BACKEND picks how pages are parsed:
+#   "auto"        selectolax if installed, else BeautifulSoup on lxml, else on html.parser
+#   "selectolax"  lexbor-based selectolax parser (pip install selectolax)
+#   "lxml"        BeautifulSoup with the lxml tree builder
+#   "html.parser" BeautifulSoup with the stdlib parser, what the scrapers used so far
+# Missing optional parsers fall back to the next one down, ending at html.parser.
+#
+# A card layout maps field names to (css selector, what to read): "text" for the stripped text,
+# anything else is read as an attribute. Class selectors use the [class="..."] form so they
+# match the exact class string, like BeautifulSoup's find(class_="a b") did.
+
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto")
+
+try:
+	import lxml  # noqa: F401
+	HAS_LXML = True
+except ImportError:
+	HAS_LXML = False
+
+try:
+	from selectolax.parser import HTMLParser as SelectolaxParser
+	HAS_SELECTOLAX = True
+except ImportError:
+	HAS_SELECTOLAX = False
+
+def resolve_backend(backend=None):
+	"""Returns the backend actually available for the requested one."""
+	backend = backend or PARSER_BACKEND
+	if backend in ("auto", "selectolax") and HAS_SELECTOLAX:
+		return "selectolax"
+	if backend in ("auto", "selectolax", "lxml") and HAS_LXML:
+		return "lxml"
+	return "html.parser"
+
+def make_soup(html, backend=None):
+	"""BeautifulSoup on the fastest tree builder available (selectolax is not a soup)."""
+	return BeautifulSoup(html, "lxml" if resolve_backend(backend) in ("lxml", "selectolax") else "html.parser")
+
+def _tag_name(selector):
+	# Tag of the last compound selector, checked before the (much slower) full match
+	last = re.sub(r"\[[^\]]*\]", "", selector).split()[-1]
+	return re.match(r"[\w-]*", last).group(0).lower() or None
+
+class CardLayout:
+	"""Precompiled selectors for the cards of a listing page and the fields of each card."""
+
+	def __init__(self, container, card, fields):
+		self.container = container
+		self.card = card
+		self.fields = fields
+		self._container = soupsieve.compile(container) if container else None
+		self._card = soupsieve.compile(card)
+		self._fields = [(name, _tag_name(selector), soupsieve.compile(selector), read) for name, (selector, read) in fields.items()]
+
+	def parse(self, html, backend=None):
+		"""Returns one dict per card, every field set to a string or None when absent."""
+		backend = resolve_backend(backend)
+		if backend == "selectolax":
+			return self._parse_selectolax(html)
+		return self.parse_soup(make_soup(html, backend))
+
+	def parse_soup(self, soup):
+		containers = self._container.select(soup) if self._container else [soup]
+		return [self._extract(card) for container in containers for card in self._card.select(container)]
+
+	def _extract(self, card):
+		# A single walk over the card's descendants fills every field with its first match
+		row = dict.fromkeys(self.fields)
+		pending = list(self._fields)
+		for tag in card.find_all(True):
+			for field in pending:
+				name, tag_name, selector, read = field
+				if (tag_name is None or tag.name == tag_name) and selector.match(tag):
+					row[name] = tag.get_text(strip=True) if read == "text" else tag.get(read)
+					pending.remove(field)
+					break
+			if not pending:
+				break
+		return row
+
+	def _parse_selectolax(self, html):
+		tree = SelectolaxParser(html)
+		containers = tree.css(self.container) if self.container else [tree.root]
+		rows = []
+		for container in containers:
+			for card in container.css(self.card):
+				row = {}
+				for name, (selector, read) in self.fields.items():
+					node = card.css_first(selector)
+					if node is None:
+						row[name] = None
+					elif read == "text":
+						row[name] = node.text(strip=True)
+					else:
+						row[name] = node.attributes.get(read)
+				rows.append(row)
+		return rows
+
+# Card layouts
+
+CONAD_CARDS = CardLayout(
+	container='div[class="product-results uk-child-width-1-1 uk-child-width-1-2@l uk-child-width-1-3@xl uk-grid"]',
+	card='div[class*="component-ProductCard"]',
+	fields={
+		"image_url": ('img', "data-src"),
+		"full_name": ('div[class="no-t-decoration product-description uk-position-relative"] h3', "text"),
+		"quantity": ('b[class="product-quantity"]', "text"),
+		"price": ('div[class="product-price f-roboto uk-margin-auto-left"]', "text"),
+		"price_per_kg": ('div[class="product-price-kg"]', "text"),
+		"red_price": ('div[class="product-price-red product-price f-roboto uk-margin-auto-left"]', "text"),
+		"discounted_price": ('div[class="product-price product-price-red f-roboto"]', "text"),
+		"card_discount": ('b[class="price sale f-roboto"]', "text"),
+		"original_price": ('div[class="product-price-original f-roboto"]', "text"),
+		"original_price_per_kg": ('div[class="product-price-kg override-color-red"]', "text"),
+	},
+)
+
+TIGRE_CARDS = CardLayout(
+	container='div[class="aggregatore-prodotti js-aggregatore-cont"]',
+	card='div[class*="swiper-slide product-card"]',
+	fields={
+		"image_url": ('img', "src"),
+		"full_name": ('a[class="product-link product-link-title"]', "text"),
+		"price": ('div[class="newPrice"]', "text"),
+		"discounted_price": ('div[class="oldPrice"]', "text"),
+		"description": ('div[class="productSubTitle"]', "text"),
+	},
+)
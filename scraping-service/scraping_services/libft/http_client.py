@@ -0,0 +1,128 @@
+import os
+import time
+import atexit
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Shared HTTP client for every libft helper.
+# One requests.Session keeps TCP/TLS connections alive between calls, each host gets its own
+# bounded pool, every request has a default timeout and transient failures are retried with
+# jittered exponential backoff. Only idempotent methods are retried: a POST that timed out or got a
+# 5xx may still have been applied, and sending it again would store the product twice. A POST is
+# retried only when the connection itself could not be opened, so nothing reached the server.
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 20))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 10))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+HTTP_MAX_BACKOFF = float(os.getenv("HTTP_MAX_BACKOFF", 30))
+
+RETRY_STATUSES = {429, 502, 503, 504}
+# urllib3's Retry.DEFAULT_ALLOWED_METHODS
+RETRY_METHODS = {"HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE"}
+
+def _not_sent(error):
+	# True when the connection was never opened (refused or timed out), so the server saw nothing
+	if isinstance(error, requests.exceptions.ConnectTimeout):
+		return True
+	reason = getattr(error.args[0], "reason", None) if error.args else None
+	return isinstance(reason, NewConnectionError)
+
+class HttpClient:
+	"""Keep-alive session with per-host pools, default timeouts and retries."""
+
+	def __init__(
+		self,
+		pool_connections=HTTP_POOL_CONNECTIONS,
+		pool_maxsize=HTTP_POOL_MAXSIZE,
+		timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+		max_retries=HTTP_MAX_RETRIES,
+		backoff_factor=HTTP_BACKOFF_FACTOR,
+		max_backoff=HTTP_MAX_BACKOFF,
+	):
+		self.timeout = timeout
+		self.max_retries = max_retries
+		self.backoff_factor = backoff_factor
+		self.max_backoff = max_backoff
+		self.retries = 0
+		self.session = requests.Session()
+		# pool_maxsize caps the connections per host, pool_block makes extra threads wait for one
+		adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True)
+		self.session.mount("http://", adapter)
+		self.session.mount("https://", adapter)
+
+	def request(self, method, url, **kwargs):
+		"""Sends a request, retrying connection errors and RETRY_STATUSES for RETRY_METHODS.
+		Returns: The last response. Raises the last RequestException if every attempt failed."""
+		kwargs.setdefault("timeout", self.timeout)
+		idempotent = method.upper() in RETRY_METHODS
+		attempt = 0
+		while True:
+			try:
+				response = self.session.request(method, url, **kwargs)
+				if not idempotent or response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+					return response
+				print(f"Got {response.status_code} from {url} (Retry {attempt + 1}/{self.max_retries})")
+			except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+				if attempt >= self.max_retries:
+					raise
+				if not idempotent and not _not_sent(e):
+					raise
+				print(f"Request to {url} failed: {e} (Retry {attempt + 1}/{self.max_retries})")
+			attempt += 1
+			self.retries += 1
+			time.sleep(self._backoff(attempt))
+
+	def get(self, url, **kwargs):
+		return self.request("GET", url, **kwargs)
+
+	def post(self, url, **kwargs):
+		return self.request("POST", url, **kwargs)
+
+	def _backoff(self, attempt):
+		# "Full jitter": a random delay up to the exponential cap, so retrying clients spread out
+		return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+	def pool_stats(self):
+		"""Returns request and connection counts summed over every host pool."""
+		stats = {"hosts": 0, "requests": 0, "connections": 0, "retries": self.retries}
+		for adapter in set(self.session.adapters.values()):
+			pools = adapter.poolmanager.pools
+			for key in pools.keys():
+				pool = pools.get(key)
+				if pool is None:
+					continue
+				stats["hosts"] += 1
+				stats["requests"] += pool.num_requests
+				stats["connections"] += pool.num_connections
+		stats["reused"] = max(stats["requests"] - stats["connections"], 0)
+		stats["reuse_ratio"] = stats["reused"] / stats["requests"] if stats["requests"] else 0.0
+		return stats
+
+	def close(self):
+		self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+	"""Returns the process-wide HttpClient, creating it on first use."""
+	global _client
+	with _client_lock:
+		if _client is None:
+			_client = HttpClient()
+			atexit.register(report_pool_stats)
+		return _client
+
+def report_pool_stats():
+	stats = _client.pool_stats()
+	if stats["requests"]:
+		print(
+			f"HTTP pool: {stats['requests']} requests over {stats['connections']} connections "
+			f"to {stats['hosts']} hosts ({stats['reuse_ratio']:.0%} reused, {stats['retries']} retries)"
+		)
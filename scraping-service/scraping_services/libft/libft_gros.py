@@ -3,6 +3,9 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from .http_client import get_client
+from .geocode_cache import get_geocode_cache
+
 load_dotenv()
 
 # Fetches the HTML content from a given URL.
@@ -11,12 +14,11 @@ load_dotenv()
 def get_html_from_url(url, headers):
 
 	try:
-		response = requests.get(url, headers = headers)
+		response = get_client().get(url, headers = headers)
 		return response
-	except:
-		if response.status_code != 200:
-			print('Request failed:', response.status_code)
-			exit()
+	except requests.exceptions.RequestException as e:
+		print('Request failed:', e)
+		exit()
 
 # Checks if the text contains the phrase "Questo indirizzo".
 # Returns: True if the text contains "Questo indirizzo", False otherwise.
@@ -38,12 +40,24 @@ def has_phone_number(string):
 	return re.search(phone_number_regex, string) is not None
 
 # Fetches geographical coordinates and additional location details for a given address using the Google Maps Geocoding API.
+# Results, and addresses the API can't resolve, are served from the local geocode cache when possible.
 # Returns: A tuple containing latitude, longitude, city, and postal code (if available).
 # Raises:
 #   ValueError: If the API key is missing.
 #   RuntimeError: If the API request fails or the response status is not 'OK'.
 
+# Statuses that depend on the address itself, as opposed to quota or key problems
+NEGATIVE_CACHE_STATUSES = {'ZERO_RESULTS', 'INVALID_REQUEST'}
+
 def geocode(address):
+	cache = get_geocode_cache()
+	cached = cache.get(address)
+	if cached is not None:
+		kind, value = cached
+		if kind == "error":
+			raise RuntimeError(value)
+		return value
+
 	api_key = os.environ.get('NEXT_PUBLIC_GOOGLE_MAPS_API_KEY')
 	if not api_key:
 		raise ValueError("API key is missing. Ensure 'NEXT_PUBLIC_GOOGLE_MAPS_API_KEY' is set in environment variables.")
@@ -51,7 +65,7 @@ def geocode(address):
 	url = f"https://maps.googleapis.com/maps/api/geocode/json?address={address}&key={api_key}"
 
 	try:
-		response = requests.get(url)
+		response = get_client().get(url)
 		response.raise_for_status()  
 		data = response.json()  
 	except requests.exceptions.RequestException as e:
@@ -71,7 +85,11 @@ def geocode(address):
 			elif 'postal_code' in component['types']:
 				postal_code = component['long_name']
 
+		cache.put(address, (lat, lng, city, postal_code))
 		return lat, lng, city, postal_code
 	else:
 		error_message = data.get('error_message', 'No error message provided.')
-		raise RuntimeError(f"Geocoding failed with status: {data['status']}. Error message: {error_message}")
\ No newline at end of file
+		message = f"Geocoding failed with status: {data['status']}. Error message: {error_message}"
+		if data.get('status') in NEGATIVE_CACHE_STATUSES:
+			cache.put_error(address, message)
+		raise RuntimeError(message)
\ No newline at end of file
@@ -15,6 +15,8 @@ from selenium.common.exceptions import ElementNotVisibleException
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 
+from .http_client import get_client
+
 # Waits for a single element to appear on the page.
 # Returns: The WebElement if found, otherwise None.
 
@@ -99,7 +101,7 @@ def wait_for_elements(driver, xpath, max_retries=3, retry_delay=5):
 
 def fetch_data(url, headers):
 
-	response = requests.get(url, headers = headers)
+	response = get_client().get(url, headers = headers)
 	if response.status_code == 200:
 		return response.json()["data"]
 	else:
@@ -144,12 +146,11 @@ def to_float(value):
 
 def get_html_from_url(url, headers):
 	try:
-		response = requests.get(url, headers = headers)
+		response = get_client().get(url, headers = headers)
 		return response
-	except:
-		if response.status_code != 200:
-			print('Request failed:', response.status_code)
-			exit()
+	except requests.exceptions.RequestException as e:
+		print('Request failed:', e)
+		exit()
 
 def extract_float_from_text(text):
 	"""Extracts a float number from a string, handling various formats."""
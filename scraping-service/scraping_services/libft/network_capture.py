@@ -0,0 +1,53 @@
+import re
+import json
+from selenium.common.exceptions import WebDriverException
+
+# Reads the JSON responses a page fetched, from Chrome's DevTools performance log.
+# The driver must be started with enable_performance_log(options); bodies are then pulled
+# through the CDP Network.getResponseBody command while the page that made them is still open.
+# fetch_json replays a request from inside the page, with the page's cookies and session.
+
+def enable_performance_log(options):
+	"""Turns on the DevTools performance log on Chrome options."""
+	options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+	return options
+
+def drain_performance_log(driver):
+	"""Discards the log entries collected so far, so the next capture only sees new requests."""
+	driver.get_log("performance")
+
+def captured_json_responses(driver, url_pattern):
+	"""Returns (url, data) for every JSON response whose URL matches url_pattern since the last read."""
+	url_pattern = re.compile(url_pattern)
+	responses = []
+	for entry in driver.get_log("performance"):
+		try:
+			message = json.loads(entry["message"])["message"]
+		except (KeyError, ValueError):
+			continue
+		if message.get("method") != "Network.responseReceived":
+			continue
+		response = message["params"]["response"]
+		if "json" not in response.get("mimeType", "") or not url_pattern.search(response["url"]):
+			continue
+		try:
+			body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": message["params"]["requestId"]})
+			responses.append((response["url"], json.loads(body["body"])))
+		except (WebDriverException, KeyError, ValueError) as e:
+			print(f"Could not read the response of {response['url']}: {e}")
+	return responses
+
+FETCH_JSON = """
+var done = arguments[arguments.length - 1];
+fetch(arguments[0], {credentials: "include", headers: {"Accept": "application/json"}})
+	.then(function (response) { return response.ok ? response.json() : null; })
+	.then(done, function () { done(null); });
+"""
+
+def fetch_json(driver, url):
+	"""Fetches url from inside the current page. Returns: The decoded JSON, or None on failure."""
+	try:
+		return driver.execute_async_script(FETCH_JSON, url)
+	except WebDriverException as e:
+		print(f"In-page fetch of {url} failed: {e}")
+		return None
@@ -2,12 +2,17 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from .http_client import get_client
+
 load_dotenv()
 
 PRODUCT_RECEIVER_BASE_URL = os.getenv('PRODUCT_RECEIVER_BASE_URL', 'https://mongodb-atlas-pied.vercel.app')
+# Most documents sent in one insertMany request
+INSERT_MANY_MAX_DOCUMENTS = int(os.getenv('INSERT_MANY_MAX_DOCUMENTS', 1000))
 
 def send_data_to_receiver(product):
-	"""Creates a new product with provided data."""
+	"""Creates a new product with provided data.
+	Returns: The HTTP status code, or None if the request could not be made."""
 	base_url = PRODUCT_RECEIVER_BASE_URL
 	url = f'{base_url}/api/insertOne'
 	send_data = {
@@ -17,13 +22,86 @@ def send_data_to_receiver(product):
 	}
 
 	try:
-		response = requests.post(url, json=send_data)
+		response = get_client().post(url, json=send_data)
 		if response.status_code == 200:
 			print(f"Product sent successfully: {send_data['data']['name']}")
 		else:
 			print(f"Failed to send {send_data['data']['name']}. Error: {response.status_code} and {response.json()}")
+		return response.status_code
 	except requests.exceptions.RequestException as e:
 		print(f"An error occurred while sending {send_data['data']['name']}: {e}")
+		return None
+
+def send_products_to_receiver(products):
+	"""Creates many products with a single request.
+	Returns: The HTTP status code, or None if the request could not be made."""
+	base_url = PRODUCT_RECEIVER_BASE_URL
+	url = f'{base_url}/api/insertMany'
+	send_data = {
+		"databaseName": "codex",
+		"collectionName": "liiistProduct",
+		"documents": products
+	}
+
+	try:
+		response = get_client().post(url, json=send_data)
+		if response.status_code == 200:
+			print(f"Batch of {len(products)} products sent successfully")
+		else:
+			print(f"Failed to send batch of {len(products)} products. Error: {response.status_code}")
+		return response.status_code
+	except requests.exceptions.RequestException as e:
+		print(f"An error occurred while sending a batch of {len(products)} products: {e}")
+		return None
+
+# Splits a fan-out document (see fan_out.py) into the one-localization payloads insertOne expects.
+# Returns: A list of product dicts, the document itself when it has no "localizations"
+
+def expand_localizations(document):
+	if "localizations" not in document:
+		return [document]
+	product_data = {key: value for key, value in document.items() if key != "localizations"}
+	return [dict(product_data, localization=localization) for localization in document["localizations"]]
+
+class ProductSender:
+	"""Sends batches of product documents as one document per product and shop, the shape every
+	reader of liiistProduct expects: through insertMany, in requests of INSERT_MANY_MAX_DOCUMENTS,
+	or one insertOne each once the receiver answered 404 to it. Shared by the fan-out, the spool
+	drain and the checkpoint replay, so every path stores the same documents."""
+
+	def __init__(self):
+		self.bulk_supported = True
+
+	def send(self, documents):
+		"""Returns: 200 if every product was accepted, otherwise the status of the failed request
+		(None if it could not be made)."""
+		products = [product_data for document in documents for product_data in expand_localizations(document)]
+		# The receiver upserts, so the products sent before a failure are harmless to send again
+		if self.bulk_supported:
+			status = self._send_bulk(products)
+			if status != 404:
+				return status
+			print("Bulk endpoint not available, falling back to one request per shop")
+			self.bulk_supported = False
+		for product_data in products:
+			status = send_data_to_receiver(product_data)
+			if status != 200:
+				return status
+		return 200
+
+	def _send_bulk(self, products):
+		for start in range(0, len(products), INSERT_MANY_MAX_DOCUMENTS):
+			status = send_products_to_receiver(products[start:start + INSERT_MANY_MAX_DOCUMENTS])
+			if status != 200:
+				return status
+		return 200
+
+_resender = ProductSender()
+
+def resend_products(products):
+	"""Sends products in bulk, one by one to receivers without insertMany.
+	Returns: True if every product was accepted."""
+	return _resender.send(products) == 200
 
 def create_store(store):
 	"""Creates a new store with provided data."""
@@ -36,7 +114,7 @@ def create_store(store):
 	}
 
 	try:
-		response = requests.post(url, json=send_data)
+		response = get_client().post(url, json=send_data)
 		if response.status_code == 200:
 			print(f"Store created successfully: {send_data['data']['name']}")
 			return response.json()
@@ -47,6 +125,28 @@ def create_store(store):
 		print(f"An error occurred while creating {send_data['data']['name']}: {e}")
 		return None
 
+def create_stores(stores):
+	"""Creates many stores with a single request.
+	Returns: The HTTP status code, or None if the request could not be made."""
+	base_url = PRODUCT_RECEIVER_BASE_URL
+	url = f'{base_url}/api/insertMany'
+	send_data = {
+		"databaseName": "codex",
+		"collectionName": "liiistStore",
+		"documents": stores
+	}
+
+	try:
+		response = get_client().post(url, json=send_data)
+		if response.status_code == 200:
+			print(f"{len(stores)} stores created successfully")
+		else:
+			print(f"Failed to create {len(stores)} stores. Error: {response.status_code}")
+		return response.status_code
+	except requests.exceptions.RequestException as e:
+		print(f"An error occurred while creating {len(stores)} stores: {e}")
+		return None
+
 def get_store_by_grocery_and_city(grocery, city):
 	"""Retrieves stores by grocery name and city."""
 	base_url = PRODUCT_RECEIVER_BASE_URL
@@ -61,7 +161,7 @@ def get_store_by_grocery_and_city(grocery, city):
 	}
 	
 	try:
-		response = requests.post(url, json=find_data)
+		response = get_client().post(url, json=find_data)
 		if response.status_code == 200:
 			print("Stores found successfully.")
 			return response.json()
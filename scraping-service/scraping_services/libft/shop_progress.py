@@ -0,0 +1,62 @@
+import os
+import json
+import time
+import threading
+
+from .crawl_state import CRAWL_STATE_DIR
+
+# JSON checkpoint of which shops a multi-shop run already covered, in place of the COUNT_SHOP
+# counter kept in .env. A run skips the shops recorded as done; once every shop is done the
+# next run starts over. The file is rewritten atomically after each shop, so an interrupted
+# run resumes where it stopped.
+
+def shop_key(shop):
+	"""Identifies a shop across runs by banner and street."""
+	return f"{shop['name']}|{shop['street']}"
+
+class ShopProgress:
+	"""Thread-safe record of the shops done or failed in the current round."""
+
+	def __init__(self, name, state_dir=CRAWL_STATE_DIR):
+		os.makedirs(state_dir, exist_ok=True)
+		self.path = os.path.join(state_dir, f"{name}_shops.json")
+		self._lock = threading.Lock()
+		self.state = {"started_at": time.time(), "shops": {}}
+		try:
+			with open(self.path, 'r', encoding='utf-8') as file:
+				self.state = json.load(file)
+		except FileNotFoundError:
+			pass
+		except (OSError, ValueError) as e:
+			print(f"Could not read {self.path}, starting a new round: {e}")
+
+	def pending(self, shops):
+		"""Returns the shops not done yet, starting a new round when every shop is done."""
+		with self._lock:
+			pending = [shop for shop in shops if self._status(shop) != "done"]
+			if shops and not pending:
+				self.state = {"started_at": time.time(), "shops": {}}
+				self._save()
+				pending = list(shops)
+			return pending
+
+	def _status(self, shop):
+		return self.state["shops"].get(shop_key(shop), {}).get("status")
+
+	def mark_done(self, shop, items):
+		self._mark(shop, {"status": "done", "items": items})
+
+	def mark_failed(self, shop, error):
+		self._mark(shop, {"status": "failed", "error": str(error)})
+
+	def _mark(self, shop, entry):
+		with self._lock:
+			entry["finished_at"] = time.time()
+			self.state["shops"][shop_key(shop)] = entry
+			self._save()
+
+	def _save(self):
+		tmp_path = f"{self.path}.tmp"
+		with open(tmp_path, 'w', encoding='utf-8') as file:
+			json.dump(self.state, file, indent=2)
+		os.replace(tmp_path, self.path)
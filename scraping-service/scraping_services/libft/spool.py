@@ -0,0 +1,263 @@
+import os
+import glob
+import json
+import time
+import atexit
+import threading
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+from .crawl_state import CRAWL_STATE_DIR
+from .send_data import ProductSender, send_data_to_receiver
+
+# Local spool between the scrapers and the product receiver.
+# With SCRAPER_SPOOL=1 the scrapers append their products to NDJSON segments in SPOOL_DIR instead
+# of waiting for the receiver, so a slow or unreachable receiver no longer slows down or loses a
+# crawl. Each process writes its own segment (<time>-<pid>.ndjson.open); every line is handed to
+# the OS as it is written and fsynced at most every SPOOL_FSYNC_INTERVAL seconds, and a segment
+# is sealed (renamed to .ndjson) once it reaches SPOOL_SEGMENT_BYTES or SPOOL_SEGMENT_SECONDS.
+# SpoolDrain (drain_spool.py) ships the sealed segments to the receiver in bulk, oldest first:
+# it waits with a growing delay while the receiver is unreachable or failing (no answer, 408, 429
+# or 5xx) instead of dropping a batch, keeps the offset of what was done next to each segment,
+# and deletes a segment once it is sent. A batch the receiver rejects for good (any other 4xx,
+# e.g. a validation error) would be rejected again forever: it is appended to the segment's
+# dead-letter file (<segment>.ndjson.rejected) and the drain moves on.
+# The writer holds an flock on its open segment. The drain, usually in another container (so PIDs
+# mean nothing to it), seals an open segment left by a dead scraper only if that lock is free
+# and the file is older than SPOOL_RECOVER_AFTER: a live writer seals its segments within
+# SPOOL_SEGMENT_SECONDS, so an open one that old has no writer.
+
+SCRAPER_SPOOL = os.getenv("SCRAPER_SPOOL", "0") == "1"
+SPOOL_DIR = os.getenv("SPOOL_DIR", os.path.join(CRAWL_STATE_DIR, "spool"))
+SPOOL_SEGMENT_BYTES = int(os.getenv("SPOOL_SEGMENT_BYTES", 8 * 1024 * 1024))
+SPOOL_SEGMENT_SECONDS = float(os.getenv("SPOOL_SEGMENT_SECONDS", 30))
+SPOOL_FSYNC_INTERVAL = float(os.getenv("SPOOL_FSYNC_INTERVAL", 1))
+SPOOL_DRAIN_BATCH = int(os.getenv("SPOOL_DRAIN_BATCH", 200))
+SPOOL_MAX_BACKOFF = float(os.getenv("SPOOL_MAX_BACKOFF", 60))
+SPOOL_RECOVER_AFTER = float(os.getenv("SPOOL_RECOVER_AFTER", 2 * SPOOL_SEGMENT_SECONDS + 10))
+
+OPEN_SUFFIX = ".ndjson.open"
+SEALED_SUFFIX = ".ndjson"
+OFFSET_SUFFIX = ".offset"
+REJECTED_SUFFIX = ".rejected"
+
+# Statuses worth waiting for; any other 4xx means the batch itself is wrong
+RETRY_STATUSES = {408, 429}
+
+class Spool:
+	"""Thread-safe writer of append-only NDJSON segments, with batched fsync."""
+
+	def __init__(self, spool_dir=SPOOL_DIR, segment_bytes=SPOOL_SEGMENT_BYTES, segment_seconds=SPOOL_SEGMENT_SECONDS, fsync_interval=SPOOL_FSYNC_INTERVAL):
+		os.makedirs(spool_dir, exist_ok=True)
+		self.spool_dir = spool_dir
+		self.segment_bytes = segment_bytes
+		self.segment_seconds = segment_seconds
+		self.fsync_interval = fsync_interval
+		self.records = 0
+		self._file = None
+		self._segment = None
+		self._opened_at = 0.0
+		self._unsynced = False
+		self._lock = threading.Lock()
+		self._stopped = threading.Event()
+		self._syncer = threading.Thread(target=self._sync_periodically, daemon=True)
+		self._syncer.start()
+
+	def append(self, document):
+		self.extend([document])
+
+	def extend(self, documents):
+		lines = b"".join((json.dumps(document, default=str, separators=(",", ":")) + "\n").encode("utf-8") for document in documents)
+		if not lines:
+			return
+		with self._lock:
+			if self._file is None:
+				self._open_segment()
+			self._file.write(lines)
+			self._file.flush()
+			self.records += len(documents)
+			self._unsynced = True
+			if self._file.tell() >= self.segment_bytes:
+				self._seal()
+
+	def send(self, product):
+		"""Drop-in for send_data_to_receiver. Returns: 200 once the product is in the spool."""
+		self.append(product)
+		return 200
+
+	def close(self):
+		self._stopped.set()
+		self._syncer.join()
+		with self._lock:
+			if self._file is not None:
+				self._seal()
+
+	def _open_segment(self):
+		self._segment = os.path.join(self.spool_dir, f"{time.time_ns():020d}-{os.getpid()}")
+		self._file = open(self._segment + OPEN_SUFFIX, "ab")
+		if fcntl is not None:
+			# Released when the file is closed, or by the OS if the process dies
+			fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+		self._opened_at = time.monotonic()
+
+	def _sync(self):
+		os.fsync(self._file.fileno())
+		self._unsynced = False
+
+	def _seal(self):
+		self._sync()
+		self._file.close()
+		os.replace(self._segment + OPEN_SUFFIX, self._segment + SEALED_SUFFIX)
+		self._file = None
+
+	def _sync_periodically(self):
+		while not self._stopped.wait(self.fsync_interval):
+			with self._lock:
+				if self._file is None:
+					continue
+				if time.monotonic() - self._opened_at >= self.segment_seconds:
+					self._seal()
+				elif self._unsynced:
+					self._sync()
+
+_spool = None
+_spool_lock = threading.Lock()
+
+def get_spool():
+	"""Returns the process-wide Spool, closed (and its segment sealed) at exit."""
+	global _spool
+	with _spool_lock:
+		if _spool is None:
+			_spool = Spool()
+			atexit.register(_spool.close)
+		return _spool
+
+def product_sender():
+	"""Returns: The function the scrapers hand a product to, the spool with SCRAPER_SPOOL=1."""
+	return get_spool().send if SCRAPER_SPOOL else send_data_to_receiver
+
+# Tells whether the scraper writing an open segment is gone: no lock on it, and not written for
+# longer than a live writer keeps a segment open.
+# Returns: True if the segment can be sealed by someone else
+
+def _abandoned(file, max_age):
+	try:
+		if time.time() - os.fstat(file.fileno()).st_mtime < max_age:
+			return False
+		if fcntl is not None:
+			fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+	except OSError:
+		return False
+	return True
+
+class SpoolDrain:
+	"""Sends the sealed segments of a spool to the receiver in bulk, waiting while it refuses them."""
+
+	def __init__(self, spool_dir=SPOOL_DIR, batch_size=SPOOL_DRAIN_BATCH, max_backoff=SPOOL_MAX_BACKOFF, recover_after=SPOOL_RECOVER_AFTER):
+		self.spool_dir = spool_dir
+		self.recover_after = recover_after
+		self.batch_size = batch_size
+		self.max_backoff = max_backoff
+		self.sent_products = 0
+		self.sent_batches = 0
+		self.rejected_products = 0
+		self.retries = 0
+		self._sender = ProductSender()
+
+	def recover_abandoned_segments(self):
+		"""Seals the open segments of scrapers that died without closing them."""
+		for path in glob.glob(os.path.join(self.spool_dir, f"*{OPEN_SUFFIX}")):
+			name = os.path.basename(path)[:-len(OPEN_SUFFIX)]
+			try:
+				file = open(path, "rb")
+			except FileNotFoundError:
+				# Sealed by its writer meanwhile
+				continue
+			with file:
+				if _abandoned(file, self.recover_after):
+					print(f"Recovering segment {name} of a scraper that is no longer running")
+					os.replace(path, path[:-len(OPEN_SUFFIX)] + SEALED_SUFFIX)
+
+	def sealed_segments(self):
+		return sorted(glob.glob(os.path.join(self.spool_dir, f"*{SEALED_SUFFIX}")))
+
+	def drain(self, follow=False, poll_interval=SPOOL_FSYNC_INTERVAL):
+		"""Sends every sealed segment; with follow, keeps waiting for new ones.
+		Returns: The number of products sent."""
+		while True:
+			self.recover_abandoned_segments()
+			segments = self.sealed_segments()
+			for path in segments:
+				self.drain_segment(path)
+			if not follow:
+				break
+			if not segments:
+				time.sleep(poll_interval)
+		print(f"Spool drain sent {self.sent_products} products in {self.sent_batches} batches, {self.retries} retries, {self.rejected_products} rejected")
+		return self.sent_products
+
+	def drain_segment(self, path):
+		offset_path = path + OFFSET_SUFFIX
+		offset = _read_offset(offset_path)
+		with open(path, "rb") as file:
+			file.seek(offset)
+			batch = []
+			for line in file:
+				offset += len(line)
+				try:
+					batch.append(json.loads(line))
+				except ValueError:
+					# Only the last line of a segment recovered from a crash can be torn
+					print(f"Skipping an unreadable line in {os.path.basename(path)}")
+				if len(batch) >= self.batch_size:
+					self._deliver(batch, path)
+					_write_offset(offset_path, offset)
+					batch = []
+			if batch:
+				self._deliver(batch, path)
+		os.remove(path)
+		if os.path.exists(offset_path):
+			os.remove(offset_path)
+
+	def _deliver(self, batch, path):
+		# Backpressure: the next batch isn't read until the receiver has taken or rejected this one
+		delay = 1.0
+		while True:
+			status = self._sender.send(batch)
+			if status == 200:
+				self.sent_products += len(batch)
+				self.sent_batches += 1
+				return
+			if status is not None and 400 <= status < 500 and status not in RETRY_STATUSES:
+				self._reject(batch, path, status)
+				return
+			self.retries += 1
+			print(f"Receiver refused a batch of {len(batch)} products ({status}), retrying in {delay:.0f}s")
+			time.sleep(delay)
+			delay = min(delay * 2, self.max_backoff)
+
+	def _reject(self, batch, path, status):
+		# Synced before the offset moves past the batch, so it is either here or sent again
+		rejected_path = path + REJECTED_SUFFIX
+		with open(rejected_path, "ab") as file:
+			file.write(b"".join((json.dumps(document, default=str, separators=(",", ":")) + "\n").encode("utf-8") for document in batch))
+			file.flush()
+			os.fsync(file.fileno())
+		self.rejected_products += len(batch)
+		print(f"Receiver rejected a batch of {len(batch)} products with {status}, moved to {os.path.basename(rejected_path)}")
+
+def _read_offset(path):
+	try:
+		with open(path, "r", encoding="utf-8") as file:
+			return int(file.read().strip() or 0)
+	except (OSError, ValueError):
+		return 0
+
+def _write_offset(path, offset):
+	tmp_path = f"{path}.tmp"
+	with open(tmp_path, "w", encoding="utf-8") as file:
+		file.write(str(offset))
+	os.replace(tmp_path, path)
@@ -1,149 +1,306 @@
 import os
-import re
 import sys
-import time
-from bs4 import BeautifulSoup
+import json
+import queue
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from dotenv import load_dotenv
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
 try:
-	from libft import wait_for_element_conad, wait_for_elements_conad, update_env_with_dotenv, get_store_by_grocery_and_city, send_data_to_receiver, extract_float_from_text, read_csv_to_list_of_dicts
+	from libft import update_env_with_dotenv, get_store_by_grocery_and_city, extract_float_from_text, read_csv_to_list_of_dicts, make_soup, CONAD_CARDS
+	from libft import ShopProgress, shop_key, snapshot_name, save_session_snapshot, restore_session_snapshot, discard_session_snapshot, wait_for_any, drain_performance_log, captured_json_responses, fetch_json
+	from libft import build_driver, TransferMeter, wait_for_dom_ready, wait_for_network_idle, wait_for_selector, wait_for_navigation, click_when_ready, StepTimer
+	from libft import Checkpoint, product_sender
 except ImportError:
 	print("Error: libft module not found. Please ensure it's in your PYTHONPATH or in the same directory.")
 	sys.exit(1)
 
 load_dotenv()
 
-# Finds product information on a webpage and sends it to a specified function.
-# Returns: The number of products processed successfully.
+CONAD_HOME = "https://spesaonline.conad.it/home"
+MENU_XPATH = '/html/body/section[1]/header/div/nav[2]/ul/li[1]/a'
+MACRO_XPATH = '/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[1]/ul/li[{macro}]/a'
+MICRO_XPATH = '/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[2]/div[{macro}]/ul/li'
+PRODUCT_CARD = 'div[class*="component-ProductCard"]'
+CONAD_BROWSERS = int(os.getenv("CONAD_BROWSERS", os.cpu_count() or 1))
 
-def scrape_product_data(driver, shop):
-	
-	processed_items = 0
-	time.sleep(5)
+# XHR mode: listing responses are matched by URL and paged through CONAD_PAGE_PARAM
+CONAD_LISTING_XHR = os.getenv("CONAD_LISTING_XHR", r"/(api|bin)/.*(product|search|listing|categor)")
+CONAD_PAGE_PARAM = os.getenv("CONAD_PAGE_PARAM", "page")
 
-	soup = BeautifulSoup(driver.page_source, 'html.parser')
-	products_container = soup.find('div', class_="product-results uk-child-width-1-1 uk-child-width-1-2@l uk-child-width-1-3@xl uk-grid")
+# Keys a listing JSON may use for each field, the first one present wins
+JSON_FIELDS = {
+	"full_name": ("name", "title", "productName", "nome"),
+	"image_url": ("imageUrl", "image", "images", "img", "thumbnail"),
+	"quantity": ("quantity", "netQuantity", "formato", "size"),
+	"price": ("price", "basePrice", "prezzo"),
+	"price_per_kg": ("pricePerUnit", "unitPrice", "pricePerKg", "prezzoAlKg"),
+	"discounted_price": ("discountedPrice", "promoPrice", "salePrice", "prezzoScontato"),
+}
 
-	if not products_container:
-		print("No products found on this page.")
-		return 0
+class SessionFlagged(Exception):
+	pass
 
-	product_cards = products_container.find_all('div', class_=re.compile(r"component-ProductCard"))
+# Bytes and load time of the pages scraped, across all the browsers of a run
+meter = TransferMeter("conad")
 
-	# bisogna sistemare come viene presa l'immagine, se il prodotto ha lo sconto con la carta prendere il simbolo conad
+# Pages already sent, set by main; None sends without checkpointing
+checkpoint = None
 
-	for product_card in product_cards:
-		image_element = product_card.find('img')
-		image_url = image_element.get('data-src') if image_element else None
+# Finds product information on the rendered page.
+# The caller waits for the page to settle (see wait_for_navigation) before calling it.
+# Returns: The receiver payloads of the complete products
 
-		name_element = product_card.find('div', class_="no-t-decoration product-description uk-position-relative")
-		name_element_h3 = name_element.find('h3') if name_element else None
-		full_name = name_element_h3.get_text(strip=True) if name_element_h3 else None
+def scrape_product_data(driver, shop):
+	
+	products = []
+	meter.record(driver)
 
-		quantity_element = product_card.find('b', class_="product-quantity")
-		quantity = quantity_element.get_text(strip=True) if quantity_element else None
+	product_cards = CONAD_CARDS.parse(driver.page_source)
 
-		price_element = product_card.find('div', class_="product-price f-roboto uk-margin-auto-left")
-		price_text = price_element.get_text(strip=True) if price_element else None
-		
-		price_per_kg_element = product_card.find('div', class_="product-price-kg")
-		price_per_kg_text = price_per_kg_element.get_text(strip=True) if price_per_kg_element else None
-
-		red_price_element = product_card.find('div', class_="product-price-red product-price f-roboto uk-margin-auto-left")
-		red_price_element = red_price_element.get_text(strip=True) if red_price_element else None
+	if not product_cards:
+		print("No products found on this page.")
+		return products
 
-		discounted_price_element = product_card.find('div', class_="product-price product-price-red f-roboto")
-		discounted_price_text = discounted_price_element.get_text(strip=True) if discounted_price_element else None
+	# bisogna sistemare come viene presa l'immagine, se il prodotto ha lo sconto con la carta prendere il simbolo conad
 
-		card_discount_element = product_card.find('b', class_="price sale f-roboto")
-		card_discount = card_discount_element.get_text(strip=True) if card_discount_element else None
+	for card in product_cards:
+		image_url = card["image_url"]
+		full_name = card["full_name"]
+		quantity = card["quantity"]
+		price_text = card["price"]
+		price_per_kg_text = card["price_per_kg"]
+		discounted_price_text = card["discounted_price"]
 
 		if discounted_price_text:
-			price_element = product_card.find('div', class_="product-price-original f-roboto")
-			price_text = price_element.get_text(strip=True) if price_element else None
-			price_per_kg_element = product_card.find('div', class_="product-price-kg override-color-red")
-			price_per_kg_text = price_per_kg_element.get_text(strip=True) if price_per_kg_element else None
+			price_text = card["original_price"]
+			price_per_kg_text = card["original_price_per_kg"]
 
-		if card_discount:
-			discounted_price_text = card_discount
+		if card["card_discount"]:
+			discounted_price_text = card["card_discount"]
 
-		if red_price_element:
-			price_text = red_price_element
+		if card["red_price"]:
+			price_text = card["red_price"]
 
 		price_per_kg = extract_float_from_text(price_per_kg_text)
 		price = extract_float_from_text(price_text)
 		discounted_price = extract_float_from_text(discounted_price_text)
 
-		product_data = {
-			"full_name": full_name,
-			"name": full_name,
-			"img_url": image_url,
-			"quantity": quantity,
-			"price": price,
-			"price_for_kg": price_per_kg,
-			"localization":
-			{
-				"grocery": shop['name'],
-				"lat": shop['lat'],
-				"lng": shop['lng'],
-				"street": shop['street']
-			}
+		product_data = build_product(shop, full_name, image_url, quantity, price, price_per_kg, discounted_price)
+		if product_data:
+			products.append(product_data)
+
+	return products
+
+# Builds the receiver payload of a product.
+# Returns: The payload, or None if the product is incomplete
+
+def build_product(shop, full_name, image_url, quantity, price, price_per_kg, discounted_price):
+
+	product_data = {
+		"full_name": full_name,
+		"name": full_name,
+		"img_url": image_url,
+		"quantity": quantity,
+		"price": price,
+		"price_for_kg": price_per_kg,
+		"localization":
+		{
+			"grocery": shop['name'],
+			"lat": shop['lat'],
+			"lng": shop['lng'],
+			"street": shop['street']
 		}
+	}
 
-		if discounted_price:
-			product_data['discount'] = discounted_price
-		
-		if all([product_data.get('full_name'), product_data.get('name'), product_data.get('price')]) and all(product_data['localization'].values()):
-			send_data_to_receiver(product_data)
-			processed_items += 1
-		else:
-			print(f"Skipping incomplete product data: {product_data}")
+	if discounted_price:
+		product_data['discount'] = discounted_price
 
-	return processed_items
+	if all([product_data.get('full_name'), product_data.get('name'), product_data.get('price')]) and all(product_data['localization'].values()):
+		return product_data
+
+	print(f"Skipping incomplete product data: {product_data}")
+	return None
+
+# Sends the products of one page of a category (or spools them, see libft/spool.py), through
+# the checkpoint when there is one.
+# Returns: The number of products sent
 
-def change_shop_location(driver, location, wait):
+def deliver(shop, category, page, products):
 
-	driver.get("https://spesaonline.conad.it/home")
-	time.sleep(5)
+	send = product_sender()
+	if checkpoint is None:
+		for product_data in products:
+			send(product_data)
+		return len(products)
+	return checkpoint.commit_page(shop_key(shop), category, page, products, send)
 
+def page_done(shop, category, page):
+	return checkpoint is not None and checkpoint.is_done(shop_key(shop), category, page)
 
-	wait.until(EC.visibility_of_element_located((By.ID, "onetrust-reject-all-handler")))
-	driver.find_element(By.ID, "onetrust-reject-all-handler").click()
-	time.sleep(2)
-	form = driver.find_element(By.CLASS_NAME, "google-input")
-	time.sleep(4)
+# Scrapes and sends the rendered page, unless a resumed run already sent it.
+# Returns: The number of products sent
+
+def scrape_page(driver, shop, category, page):
+	if page_done(shop, category, page):
+		return 0
+	return deliver(shop, category, page, scrape_product_data(driver, shop))
+
+def json_value(item, keys):
+	for key in keys:
+		value = item.get(key)
+		# Prices and images often come wrapped, e.g. {"value": 1.99} or [{"url": ...}]
+		if isinstance(value, dict):
+			value = value.get("value", value.get("url", value.get("formattedValue")))
+		if isinstance(value, list) and value:
+			value = value[0].get("url") if isinstance(value[0], dict) else value[0]
+		if value is not None and value != "" and value != [] and value != {}:
+			return value
+	return None
+
+def to_price(value):
+	if isinstance(value, (int, float)):
+		return float(value)
+	return extract_float_from_text(value) if isinstance(value, str) else None
+
+# Looks through a listing response for the list of products: the first list of objects
+# that mostly carry both a name and a price.
+# Returns: The list of product objects, or None
+
+def find_product_list(data):
+
+	if isinstance(data, list):
+		objects = [item for item in data if isinstance(item, dict)]
+		if objects:
+			looks_like_products = sum(1 for item in objects if json_value(item, JSON_FIELDS["full_name"]) and json_value(item, JSON_FIELDS["price"]) is not None)
+			if looks_like_products * 2 > len(objects):
+				return objects
+		children = objects
+	elif isinstance(data, dict):
+		children = data.values()
+	else:
+		return None
+
+	for child in children:
+		found = find_product_list(child)
+		if found:
+			return found
+	return None
+
+def json_products(shop, items):
+	products = []
+	for item in items:
+		product_data = build_product(
+			shop,
+			json_value(item, JSON_FIELDS["full_name"]),
+			json_value(item, JSON_FIELDS["image_url"]),
+			json_value(item, JSON_FIELDS["quantity"]),
+			to_price(json_value(item, JSON_FIELDS["price"])),
+			to_price(json_value(item, JSON_FIELDS["price_per_kg"])),
+			to_price(json_value(item, JSON_FIELDS["discounted_price"])),
+		)
+		if product_data:
+			products.append(product_data)
+	return products
+
+def with_page(url, page):
+	parts = urlparse(url)
+	query = parse_qs(parts.query)
+	query[CONAD_PAGE_PARAM] = [str(page)]
+	return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+# Sends the products of the category page just loaded straight from the listing JSON the
+# page fetched, then requests the following pages from inside the page by changing the
+# page parameter, without rendering or clicking anything. Pages a resumed run already sent
+# are still fetched, to know where the listing ends, but not sent again.
+# Returns: The number of products sent, or None when the page made no listing request
+
+def scrape_category_xhr(driver, shop, category, timer):
+
+	for url, data in captured_json_responses(driver, CONAD_LISTING_XHR):
+		items = find_product_list(data)
+		if items:
+			break
+	else:
+		return None
+
+	meter.record(driver)
+	seen = {json.dumps(item, sort_keys=True) for item in items}
+
+	# Whether pages count from 0 or 1 isn't known when the URL has no page parameter,
+	# so the first probe may return the page already sent without ending the walk
+	query = parse_qs(urlparse(url).query)
+	page = int(query.get(CONAD_PAGE_PARAM, ["0"])[0])
+	processed_items = 0 if page_done(shop, category, page) else deliver(shop, category, page, json_products(shop, items))
+	first_probe = CONAD_PAGE_PARAM not in query
+	while True:
+		page += 1
+		with timer.step("xhr_page"):
+			data = fetch_json(driver, with_page(url, page))
+		meter.record(driver)
+		new_items = [item for item in (find_product_list(data) or []) if json.dumps(item, sort_keys=True) not in seen]
+		if not new_items and first_probe:
+			first_probe = False
+			continue
+		if not new_items:
+			break
+		first_probe = False
+		seen.update(json.dumps(item, sort_keys=True) for item in new_items)
+		if not page_done(shop, category, page):
+			processed_items += deliver(shop, category, page, json_products(shop, new_items))
+
+	return processed_items
+
+def change_shop_location(driver, location):
+
+	driver.get(CONAD_HOME)
+	wait_for_dom_ready(driver)
+
+	click_when_ready(driver, (By.ID, "onetrust-reject-all-handler"))
+	wait_for_selector(driver, (By.CLASS_NAME, "google-input"))
 
 	driver.execute_script("window.scrollBy(0, 200);")
 
-	wait.until(EC.visibility_of_element_located((By.ID, "googleInputEntrypageLine1")))
-	form.find_element(By.ID, "googleInputEntrypageLine1").send_keys(location)
-	time.sleep(4)
+	wait_for_selector(driver, (By.ID, "googleInputEntrypageLine1")).send_keys(location)
+	# The address goes through the Places autocomplete before the form can be submitted
+	wait_for_network_idle(driver)
 
-	wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "submitButton")))
-	form.find_element(By.CLASS_NAME, "submitButton").click()
+	click_when_ready(driver, ".google-input .submitButton")
+	click_when_ready(driver, (By.XPATH, '//*[@id="ordina-e-ritira"]/div/div/button'))
+	click_when_ready(driver, (By.XPATH, '//*[@id="ordina-ritira-scelta-pdv"]/div[2]/div/div[1]/div/ul/li[1]/div'))
+	click_when_ready(driver, (By.XPATH, '//*[@id="modal-onboarding-wrapper"]/div[2]/div[5]/button'))
+	wait_for_network_idle(driver)
 
-	wait.until(EC.visibility_of_element_located((By.XPATH, '//*[@id="ordina-e-ritira"]/div/div/button')))
-	driver.find_element(By.XPATH, '//*[@id="ordina-e-ritira"]/div/div/button').click()
-	time.sleep(4)
+	# A captcha iframe at this point means the session was flagged
+	if driver.find_elements(By.XPATH, '/html/body/div[34]/div[2]/iframe'):
+		raise SessionFlagged("captcha shown after selecting the shop")
 
-	wait.until(EC.visibility_of_element_located((By.XPATH, '//*[@id="ordina-ritira-scelta-pdv"]/div[2]/div/div[1]/div/ul/li[1]/div')))
-	driver.find_element(By.XPATH, '//*[@id="ordina-ritira-scelta-pdv"]/div[2]/div/div[1]/div/ul/li[1]/div').click()
-	time.sleep(4)
+# Selects the shop, restoring its saved session when there is a fresh one the site still accepts.
 
-	wait.until(EC.visibility_of_element_located((By.XPATH, '//*[@id="modal-onboarding-wrapper"]/div[2]/div[5]/button')))
-	driver.find_element(By.XPATH, '//*[@id="modal-onboarding-wrapper"]/div[2]/div[5]/button').click()
-	
-	try:
-		wait.until(EC.visibility_of_element_located((By.XPATH, '/html/body/div[34]/div[2]/iframe')))
-		exit(1)
-	except:
-		time.sleep(30)
+def select_shop(driver, shop):
+
+	name = snapshot_name("conad", shop_key(shop))
+	if restore_session_snapshot(driver, name, CONAD_HOME):
+		wait_for_dom_ready(driver)
+		# With a shop selected the home page offers the category menu instead of the address form
+		if wait_for_any(driver, [(By.XPATH, MENU_XPATH), ".google-input"]) == (By.XPATH, MENU_XPATH):
+			return
+		discard_session_snapshot(name)
+
+	change_shop_location(driver, shop['street'])
+	save_session_snapshot(driver, name)
+
+# Clicks an element that loads another page and waits for that page to settle.
+
+def click_and_wait(driver, selector, old_element=None):
+	old_element = old_element or driver.find_element(By.TAG_NAME, "html")
+	click_when_ready(driver, selector)
+	wait_for_navigation(driver, old_element)
 
 def get_stores(result_dict):
 	"""Helper function to safely get 'stores' from a result dictionary."""
@@ -157,12 +314,10 @@ def get_stores(result_dict):
 	except KeyError:
 		return []
 
-# Find all the products
-
-if __name__ == "__main__":
+# Collects the Conad shops of Rome from the receiver, or from conad_shop.csv when it has none.
+# Returns: The list of shop dicts
 
-	all_shop = os.environ.get("ALL_SHOP")
-	count_shop = os.environ.get("COUNT_SHOP")
+def load_shops():
 
 	result1 = get_store_by_grocery_and_city("Conad Superstore", "ROMA")
 	result2 = get_store_by_grocery_and_city("Conad", "ROMA")
@@ -170,94 +325,221 @@ if __name__ == "__main__":
 	result4 = get_store_by_grocery_and_city("Spazio Conad", "ROMA")
 	result5 = get_store_by_grocery_and_city("Conad", "GUIDONIA MONTECELIO")
 
-	if int(count_shop) == 61:
-		update_env_with_dotenv(".env", "COUNT_SHOP", 0)
-		count_shop = 0
-	else: 
-		count_shop = int(count_shop)
-	try:
-		shop_list = {
-			'stores': get_stores(result1) + get_stores(result2) + get_stores(result3) + get_stores(result4) + get_stores(result5)
-		}
-	except KeyError as e:
-		print(f"Error: Missing 'stores' key in one of the result dictionaries. Error: {e}")
-		shop_list = {'stores': []}
-
-	if not shop_list['stores']:
-		shop_list_csv = read_csv_to_list_of_dicts("conad_shop.csv")
-		if shop_list_csv:
-			try:
-				shop = shop_list_csv[count_shop]
-			except IndexError:
-				print(f"Error: count_shop ({count_shop}) is out of range for CSV data.")
-		else:
-			print("Warning: conad_shop.csv is empty or could not be read.")
-	else:
-		try:
-			shop = shop_list['stores'][count_shop]
-			print(shop)
-		except IndexError:
-			print(f"Error: count_shop ({count_shop}) is out of range for the 'stores' list.")
+	shop_list = get_stores(result1) + get_stores(result2) + get_stores(result3) + get_stores(result4) + get_stores(result5)
+	if shop_list:
+		return shop_list
 
-	options = uc.ChromeOptions()
+	shop_list_csv = read_csv_to_list_of_dicts("conad_shop.csv")
+	if not shop_list_csv:
+		print("Warning: conad_shop.csv is empty or could not be read.")
+		return []
+	return shop_list_csv
 
-	options.binary_location = "/usr/bin/google-chrome"
+def new_driver(headless=False, capture_network=False):
+	# The single-shop run stays visible so the captcha can be solved by hand
+	return build_driver(headless=headless, capture_network=capture_network)
 
-	# options.add_argument("--headless")
-	options.add_argument("--no-sandbox")
-	options.add_argument("--disable-dev-shm-usage")
+# Selects a shop and walks every category of its catalogue.
+# With xhr the products come from the listing responses (see scrape_category_xhr); categories
+# that made none are read from the DOM, following the next page link without clicking it.
+# Categories are keyed by the path of their link in the checkpoint; those a resumed run
+# already completed are not opened.
+# Returns: The number of products sent
 
-	# Initialize the undetected Chrome driver
-	driver = uc.Chrome(options=options, use_subprocess=False)
-	wait = WebDriverWait(driver, 30)
+def scrape_shop(driver, shop, timer, xhr=False):
 
 	total_items_processed = 0
-	change_shop_location(driver, shop['street'], wait)
+	with timer.step("select_shop"):
+		select_shop(driver, shop)
 
-	wait.until(EC.visibility_of_element_located((By.XPATH, '/html/body/section[1]/header/div/nav[2]/ul/li[1]/a')))
-	driver.find_element(By.XPATH, '/html/body/section[1]/header/div/nav[2]/ul/li[1]/a').click()
-	time.sleep(3)
+	with timer.step("open_menu"):
+		click_when_ready(driver, (By.XPATH, MENU_XPATH))
+		wait_for_selector(driver, 'ul[class="uk-nav uk-dropdown-nav catList"]', "present")
 
-	soup = BeautifulSoup(driver.page_source, 'html.parser')
+	soup = make_soup(driver.page_source)
 	macro_cat = soup.find('ul', class_="uk-nav uk-dropdown-nav catList")
 	count_macro_cat = len(macro_cat.find_all('li'))
 
 	for macro_count in range(1, count_macro_cat + 1):
 		
-		wait.until(EC.visibility_of_element_located((By.XPATH, f'/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[1]/ul/li[{macro_count}]/a')))
-		driver.find_element(By.XPATH, f'/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[1]/ul/li[{macro_count}]/a').click()
-		time.sleep(3)
-		
-		count_micro_cat = len((wait_for_elements_conad(driver, f'/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[2]/div[{macro_count}]/ul/li')))
+		with timer.step("open_macro_category"):
+			click_when_ready(driver, (By.XPATH, MACRO_XPATH.format(macro=macro_count)))
+			micro_xpath = MICRO_XPATH.format(macro=macro_count)
+			wait_for_selector(driver, (By.XPATH, micro_xpath), "present")
+			count_micro_cat = len(driver.find_elements(By.XPATH, micro_xpath))
 	
 		for micro_count in range(2, count_micro_cat + 1):
 			
-			wait.until(EC.visibility_of_element_located((By.XPATH, f'/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[2]/div[{macro_count}]/ul/li[{micro_count}]/a')))
-			driver.find_element(By.XPATH, f'/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[2]/div[{macro_count}]/ul/li[{micro_count}]/a').click()
-			time.sleep(3)
+			link = (By.XPATH, f"{micro_xpath}[{micro_count}]/a")
+			href = driver.find_element(*link).get_attribute("href")
+			category = urlparse(href).path if href else f"{macro_count}/{micro_count}"
+			if checkpoint is not None and checkpoint.is_done(shop_key(shop), category):
+				continue
+
+			if xhr:
+				drain_performance_log(driver)
+			with timer.step("open_category"):
+				click_and_wait(driver, link)
+
+			processed_items = scrape_category_xhr(driver, shop, category, timer) if xhr else None
+			if processed_items is not None:
+				total_items_processed += processed_items
+			elif xhr:
+				total_items_processed += scrape_category_links(driver, shop, category, timer)
+
+			page = 1
+			while not xhr:
+
+				with timer.step("scrape_page"):
+					total_items_processed += scrape_page(driver, shop, category, page)
+
+				next_page = driver.find_elements(By.XPATH, "//a[@aria-label='Pagina Successiva']")
+				if not next_page:
+					break
+				# The first card goes stale whether the next page is a navigation or a re-render
+				cards = driver.find_elements(By.CSS_SELECTOR, PRODUCT_CARD)
+				try:
+					with timer.step("next_page"):
+						click_and_wait(driver, (By.XPATH, "//a[@aria-label='Pagina Successiva']"), cards[0] if cards else None)
+				except WebDriverException:
+					break
+				page += 1
+
+			if checkpoint is not None:
+				checkpoint.mark_done(shop_key(shop), category)
+			
+			with timer.step("open_menu"):
+				click_when_ready(driver, (By.XPATH, MENU_XPATH))
+				click_when_ready(driver, (By.XPATH, MACRO_XPATH.format(macro=macro_count)))
 
-			# c'è anche da togliere questo e sostituirlo con bs4
-			if (wait_for_element_conad(driver, "/html/body/main/div/div[2]/div[2]/div[4]/section") == None):
-				advertising = 4
-			else:
-				advertising = 5
+	return total_items_processed
 
-			while True:
+# Scrapes the DOM of every page of the current category, loading the next page from the
+# href of its link instead of clicking it.
+# Returns: The number of products sent
 
-				total_items_processed += scrape_product_data(driver, shop)
+def scrape_category_links(driver, shop, category, timer):
 
-				try:
-					driver.find_element(By.XPATH, "//a[@aria-label='Pagina Successiva']").click()
-				except:
-					break
-			
-			wait.until(EC.visibility_of_element_located((By.XPATH, '/html/body/section[1]/header/div/nav[2]/ul/li[1]/a')))
-			driver.find_element(By.XPATH, '/html/body/section[1]/header/div/nav[2]/ul/li[1]/a').click()
-			time.sleep(3)
-			wait.until(EC.visibility_of_element_located((By.XPATH, f'/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[1]/ul/li[{macro_count}]/a')))
-			driver.find_element(By.XPATH, f'/html/body/section[1]/header/div/nav[2]/ul/li[1]/div/div/div/div[1]/ul/li[{macro_count}]/a').click()
+	processed_items = 0
+	page = 1
+	while True:
+		with timer.step("scrape_page"):
+			processed_items += scrape_page(driver, shop, category, page)
+
+		next_page = driver.find_elements(By.XPATH, "//a[@aria-label='Pagina Successiva']")
+		href = next_page[0].get_attribute("href") if next_page else None
+		if not href:
+			return processed_items
+		with timer.step("next_page"):
+			driver.get(href)
+			wait_for_dom_ready(driver)
+			wait_for_network_idle(driver)
+		page += 1
+
+# One browser of the pool: takes shops from the queue until it is empty.
+# Whatever a shop raises (browser, CAPTCHA, parsing or network errors), the shop is recorded as
+# failed and its browser replaced, so the worker goes on with the next shop.
+
+def pool_worker(shops, progress, timer, xhr):
+
+	driver = None
+	try:
+		while True:
+			try:
+				shop = shops.get_nowait()
+			except queue.Empty:
+				return
+			try:
+				driver = driver or new_driver(headless=True, capture_network=xhr)
+				items = scrape_shop(driver, shop, timer, xhr)
+				progress.mark_done(shop, items)
+				print(f"{shop['name']} {shop['street']}: {items} products")
+			except Exception as e:
+				error = e if isinstance(e, (WebDriverException, SessionFlagged)) else f"{type(e).__name__}: {e}"
+				print(f"{shop['name']} {shop['street']} failed: {error}")
+				progress.mark_failed(shop, error)
+				if driver:
+					try:
+						driver.quit()
+					except WebDriverException:
+						pass
+				driver = None
+	finally:
+		if driver:
+			driver.quit()
+
+# Scrapes every pending shop with a pool of headless browsers.
+# Progress is checkpointed in state/conad_shops.json instead of COUNT_SHOP.
+
+def run_pool(workers, xhr=False):
+
+	timer = StepTimer("conad")
+	progress = ShopProgress("conad")
+	pending = progress.pending(load_shops())
+	shops = queue.Queue()
+	for shop in pending:
+		shops.put(shop)
+
+	workers = max(1, min(workers, len(pending)))
+	print(f"Scraping {len(pending)} Conad shops with {workers} browsers")
+	threads = [threading.Thread(target=pool_worker, args=(shops, progress, timer, xhr)) for _ in range(workers)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	timer.report()
+	meter.report()
+
+# Find all the products
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description="Scrape the Conad catalogue of the shops in Rome.")
+	parser.add_argument("--pool", action="store_true", help="scrape every pending shop with a pool of headless browsers")
+	parser.add_argument("--workers", type=int, default=CONAD_BROWSERS, help="browsers in the pool (default: CONAD_BROWSERS)")
+	parser.add_argument("--xhr", action="store_true", help="read products from the listing JSON the site fetches instead of the DOM")
+	parser.add_argument("--resume", action="store_true", help="continue the interrupted run from its checkpoint")
+	args = parser.parse_args()
+
+	checkpoint = Checkpoint("conad", resume=args.resume)
+	checkpoint.replay_pending()
+
+	if args.pool:
+		run_pool(args.workers, args.xhr)
+		checkpoint.close()
+		sys.exit(0)
+
+	all_shop = os.environ.get("ALL_SHOP")
+	count_shop = os.environ.get("COUNT_SHOP")
+
+	if int(count_shop) == 61:
+		update_env_with_dotenv(".env", "COUNT_SHOP", 0)
+		count_shop = 0
+	else: 
+		count_shop = int(count_shop)
+
+	shop_list = load_shops()
+	try:
+		shop = shop_list[count_shop]
+		print(shop)
+	except IndexError:
+		print(f"Error: count_shop ({count_shop}) is out of range for the shop list.")
+		sys.exit(1)
+
+	driver = new_driver(capture_network=args.xhr)
+	timer = StepTimer("conad")
+
+	try:
+		total_items_processed = scrape_shop(driver, shop, timer, args.xhr)
+	except SessionFlagged as e:
+		print(f"Error: {e}")
+		driver.quit()
+		sys.exit(1)
 		
 	print(total_items_processed)
+	timer.report()
+	meter.report()
 	update_env_with_dotenv(".env", "COUNT_SHOP", int(count_shop + 1))
 
+	checkpoint.close()
 	driver.quit()
@@ -1,7 +1,10 @@
+import os
+import json
 import time
 import logging
 import schedule
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(
@@ -10,41 +13,107 @@ logging.basicConfig(
 	handlers=[logging.StreamHandler()]
 )
 
-def run_all_scripts():
-	scripts = [
-		"/app/scraping/gros_groups/cts/scraping_cts.py",
-		"/app/scraping/gros_groups/dem/scraping_dem.py",
-		"/app/scraping/gros_groups/effepiu/scraping_effepiu.py",
-		"/app/scraping/gros_groups/idromarket/scraping_idromarket.py",
-		"/app/scraping/gros_groups/il_castoro/scraping_il_castoro.py",
-		"/app/scraping/gros_groups/ipercarni/scraping_ipercarni.py",
-		"/app/scraping/gros_groups/ipertiscount/scraping_ipertiscount.py",
-		"/app/scraping/gros_groups/ma/scraping_ma.py",
-		"/app/scraping/gros_groups/pewex/scraping_pewex.py",
-		"/app/scraping/gros_groups/pim/scraping_pim.py",
-		"/app/scraping/gros_groups/sacoph/scraping_sacoph.py",
-		"/app/scraping/gros_groups/top/scraping_top.py",
-	]
-
-	for script in scripts:
-		logging.info(f"Starting {script}...")
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# "sequential" runs one banner after the other, "parallel" runs them on a worker pool
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "sequential")
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 4))
+BANNER_TIMEOUT = int(os.getenv("BANNER_TIMEOUT", 3 * 60 * 60))
+LOG_DIR = os.getenv("SCHEDULER_LOG_DIR", os.path.join(SCRIPTS_DIR, "logs"))
+
+# Path to a file storing the duration of each banner in the last run
+DURATIONS_FILE = os.getenv("SCHEDULER_DURATIONS_FILE", os.path.join(SCRIPTS_DIR, "banner_durations.json"))
+
+scripts = [
+	"cts/scraping_cts.py",
+	"dem/scraping_dem.py",
+	"effepiu/scraping_effepiu.py",
+	"idromarket/scraping_idromarket.py",
+	"il_castoro/scraping_il_castoro.py",
+	"ipercarni/scraping_ipercarni.py",
+	"ipertriscount/scraping_ipertriscount.py",
+	"ma/scraping_ma.py",
+	"pewex/scraping_pewex.py",
+	"pim/scraping_pim.py",
+	"sacoph/scraping_sacoph.py",
+	"top/scraping_top.py",
+]
+
+def load_durations():
+	"""Load the per-banner durations recorded by the previous run."""
+	try:
+		with open(DURATIONS_FILE, "r") as file:
+			return json.load(file)
+	except (FileNotFoundError, json.JSONDecodeError):
+		return {}
+
+def save_durations(durations):
+	"""Persist the per-banner durations for the next run."""
+	with open(DURATIONS_FILE, "w") as file:
+		json.dump(durations, file, indent=2)
+
+def order_by_duration(script_list, durations):
+	"""Slowest banners first, banners never seen before go in front."""
+	return sorted(script_list, key=lambda script: durations.get(script, float("inf")), reverse=True)
+
+def run_script(script):
+	"""Run one banner, streaming its output to logs/<banner>.log. Returns (script, duration, returncode)."""
+	banner = os.path.splitext(os.path.basename(script))[0]
+	log_path = os.path.join(LOG_DIR, f"{banner}.log")
+
+	logging.info(f"Starting {script}, output in {log_path}...")
+	start_time = time.time()
+	with open(log_path, "w") as log_file:
 		try:
-			start_time = time.time()
-			result = subprocess.run(["python3", script], capture_output=True, text=True)
-			duration = time.time() - start_time
-			logging.info(f"Finished {script} in {duration:.2f} seconds.")
-			logging.info(f"Output of {script}:\n{result.stdout}")
-			if result.stderr:
-				logging.error(f"Error in {script}:\n{result.stderr}")
-		except Exception as e:
-			logging.error(f"Failed to run {script}: {e}")
+			result = subprocess.run(
+				["python3", os.path.join(SCRIPTS_DIR, script)],
+				stdout=log_file,
+				stderr=subprocess.STDOUT,
+				timeout=BANNER_TIMEOUT,
+			)
+			returncode = result.returncode
+		except subprocess.TimeoutExpired:
+			logging.error(f"{script} timed out after {BANNER_TIMEOUT} seconds.")
+			returncode = None
+	duration = time.time() - start_time
+
+	if returncode == 0:
+		logging.info(f"Finished {script} in {duration:.2f} seconds.")
+	elif returncode is not None:
+		logging.error(f"{script} exited with code {returncode} after {duration:.2f} seconds, see {log_path}.")
+	return script, duration, returncode
+
+def run_all_scripts():
+	os.makedirs(LOG_DIR, exist_ok=True)
+	durations = load_durations()
+	ordered_scripts = order_by_duration(scripts, durations)
+
+	if SCHEDULER_MODE == "parallel":
+		logging.info(f"Running {len(ordered_scripts)} banners with {SCHEDULER_WORKERS} workers...")
+		with ThreadPoolExecutor(max_workers=SCHEDULER_WORKERS) as executor:
+			futures = {executor.submit(run_script, script): script for script in ordered_scripts}
+			for future in as_completed(futures):
+				try:
+					script, duration, _ = future.result()
+					durations[script] = duration
+				except Exception as e:
+					logging.error(f"Failed to run {futures[future]}: {e}")
+	else:
+		for script in ordered_scripts:
+			try:
+				script, duration, _ = run_script(script)
+				durations[script] = duration
+			except Exception as e:
+				logging.error(f"Failed to run {script}: {e}")
 
+	save_durations(durations)
 	logging.info("All scripts have been processed.")
 
-# Schedule the task to run daily at midnight
-schedule.every().day.at("03:00").do(run_all_scripts)
+if __name__ == "__main__":
+	# Schedule the task to run daily at 03:00
+	schedule.every().day.at("03:00").do(run_all_scripts)
 
-# Run the scheduler loop
-while True:
-	schedule.run_pending()
-	time.sleep(1)
+	# Run the scheduler loop
+	while True:
+		schedule.run_pending()
+		time.sleep(1)
@@ -1,10 +1,10 @@
 import os
-import re
 import sys
 import time
-from bs4 import BeautifulSoup
+import argparse
+import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from dotenv import load_dotenv
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
@@ -12,44 +12,56 @@ from selenium.webdriver.support import expected_conditions as EC
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
-from utility_tigre import categories_dict
 try:
-	from libft import update_env_with_dotenv, send_data_to_receiver, get_store_by_grocery_and_city, extract_float_from_text, read_csv_to_list_of_dicts
+	from libft import update_env_with_dotenv, get_store_by_grocery_and_city, extract_float_from_text, read_csv_to_list_of_dicts, TIGRE_CARDS
+	from libft import build_driver, TransferMeter, HttpClient, copy_cookies_to_session, shop_key, snapshot_name, save_session_snapshot, restore_session_snapshot, discard_session_snapshot, wait_for_dom_ready
+	from libft import Checkpoint, CATEGORY_DONE, product_sender
 except ImportError:
 	print("Error: libft module not found. Please ensure it's in your PYTHONPATH or in the same directory.")
 	sys.exit(1)
 
 load_dotenv()
 
-# Finds and processes information from product cards in a micro category
-# Returns: The number of processed items
+from tigre_categories import load_categories, load_stats, plan_categories, record_counts
 
-def find_and_send_info(shop, products_contenir):
+TIGRE_HOME = "https://oasitigre.it/it/spesa.html"
+TIGRE_FETCH_WORKERS = int(os.getenv("TIGRE_FETCH_WORKERS", 8))
+TIGRE_PARSE_WORKERS = int(os.getenv("TIGRE_PARSE_WORKERS", os.cpu_count() or 1))
 
-	processed_items = 0
-	
-	if not products_contenir:
-		print("No products found on this page.")
-		return 0
+# Categories already sent, set by main; None sends without checkpointing.
+# A category is a single page, so it is recorded as done with its products.
+checkpoint = None
 
-	product_cards = products_contenir.find_all('div', class_=re.compile(r"swiper-slide product-card"))
+def category_url(category, item):
+	return f"https://oasitigre.it/it/spesa/reparti/{category}/{item}.html"
 
-	for product_card in product_cards:
+# Finds and processes information from the product cards of a micro category page
+# Returns: The number of processed items
 
-		image_element = product_card.find('img')
-		image_url = image_element.get('src') if image_element else None
+def find_and_send_info(shop, category, html):
+	return send_cards(shop, category, TIGRE_CARDS.parse(html))
 
-		name_element = product_card.find('a', class_="product-link product-link-title")
-		full_name = name_element.get_text(strip=True) if name_element else None
+def category_key(category):
+	return "/".join(category)
 
-		price_element = product_card.find('div', class_="newPrice")
-		price_text = price_element.get_text(strip=True) if price_element else None
+# Sends (or spools, see libft/spool.py) the products of the parsed cards of a category page,
+# through the checkpoint when there is one
+# Returns: The number of processed items
+
+def send_cards(shop, category, product_cards):
 
-		discounted_price_element = product_card.find('div', class_="oldPrice")
-		discounted_price_text = discounted_price_element.get_text(strip=True) if discounted_price_element else None
+	products = []
 
-		description_element = product_card.find('div', class_="productSubTitle")
-		description = description_element.get_text(strip=True) if description_element else None
+	if not product_cards:
+		print("No products found on this page.")
+
+	for card in product_cards:
+
+		image_url = card["image_url"]
+		full_name = card["full_name"]
+		price_text = card["price"] or ""
+		discounted_price_text = card["discounted_price"]
+		description = card["description"]
 
 		price = extract_float_from_text(price_text)
 		discounted_price = extract_float_from_text(discounted_price_text)
@@ -81,7 +93,7 @@ def find_and_send_info(shop, products_contenir):
 			}
 		}
 
-		if description_element:
+		if description is not None:
 			product_data["description"] = description
 		if price_for_kg:
 			product_data["price_for_kg"] = price_for_kg
@@ -89,12 +101,16 @@ def find_and_send_info(shop, products_contenir):
 			product_data["discount"] = discounted_price
 
 		if all([product_data.get('full_name'), product_data.get('name'), product_data.get('price')]) and all(product_data['localization'].values()):
-			send_data_to_receiver(product_data)
-			processed_items += 1
+			products.append(product_data)
 		else:
 			print(f"Skipping incomplete product data: {product_data}")
 
-	return processed_items
+	send = product_sender()
+	if checkpoint is not None:
+		return checkpoint.commit_page(shop_key(shop), category_key(category), CATEGORY_DONE, products, send)
+	for product_data in products:
+		send(product_data)
+	return len(products)
 
 # Selects the first Oasi Tigre store in a given location.
 
@@ -102,7 +118,7 @@ def change_shop_location(driver, location):
 
 	wait = WebDriverWait(driver, 10)
 
-	driver.get("https://oasitigre.it/it/spesa.html")
+	driver.get(TIGRE_HOME)
 
 	button1 = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/main/div[1]/div[2]/div[1]/div/div/button[1]")))
 	button1.click()
@@ -121,13 +137,78 @@ def change_shop_location(driver, location):
 
 	if len(available_shops) == 0:
 		print('No shops found')
-		return
+		return False
 
 	available_shops[0].click()
 	time.sleep(5)
 	button2 = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[4]/div[2]/div[3]/div[3]/div[8]/button")))
 	button2.click()
 	time.sleep(4)
+	return True
+
+# Selects the shop, restoring its saved session when there is a fresh one the site still accepts.
+# Returns: False if no shop could be selected
+
+def select_shop(driver, shop, probe):
+
+	name = snapshot_name("tigre", shop_key(shop))
+	if restore_session_snapshot(driver, name, TIGRE_HOME):
+		# One category page (probe) is enough to tell whether the store selection still holds
+		driver.get(category_url(*probe))
+		wait_for_dom_ready(driver)
+		if TIGRE_CARDS.parse(driver.page_source):
+			return True
+		discard_session_snapshot(name)
+
+	if not change_shop_location(driver, shop['street']):
+		return False
+	save_session_snapshot(driver, name)
+	return True
+
+def fetch_category_page(client, url):
+	"""Returns (url, html, error) so failures travel with the page they belong to."""
+	try:
+		response = client.get(url)
+		if response.status_code != 200:
+			return url, None, f"HTTP {response.status_code}"
+		return url, response.text, None
+	except requests.exceptions.RequestException as e:
+		return url, None, str(e)
+
+def parse_category_page(html):
+	# Runs in a worker process: takes the page text, returns plain dicts
+	return TIGRE_CARDS.parse(html)
+
+# Fetches the given (category, item) pages over plain HTTP with the store cookies of client,
+# parses the pages in a process pool and sends their products.
+# Returns: {(category, item): processed items} for the pages that could be fetched
+
+def crawl_categories_http(shop, client, categories):
+
+	urls = {category_url(category, item): (category, item) for category, item in categories}
+	counts = {}
+	failures = []
+
+	with ThreadPoolExecutor(max_workers=TIGRE_FETCH_WORKERS) as fetchers, ProcessPoolExecutor(max_workers=TIGRE_PARSE_WORKERS) as parsers:
+		parses = {}
+		for future in as_completed([fetchers.submit(fetch_category_page, client, url) for url in urls]):
+			url, html, error = future.result()
+			if error == "HTTP 404":
+				# A removed category counts as empty, so it gets pruned
+				counts[urls[url]] = 0
+			elif error:
+				failures.append((url, error))
+			else:
+				parses[parsers.submit(parse_category_page, html)] = url
+		for future in as_completed(parses):
+			category = urls[parses[future]]
+			counts[category] = send_cards(shop, category, future.result())
+
+	for url, error in failures:
+		print(f"Skipped {url}: {error}")
+	if urls and not any(counts.values()):
+		print("Warning: no products on any category page, the store cookie may not have been applied.")
+	return counts
 
 def get_stores(result_dict):
 	"""Helper function to safely get 'stores' from a result dictionary."""
@@ -143,6 +224,14 @@ def get_stores(result_dict):
 
 if __name__ == "__main__":
 
+	parser = argparse.ArgumentParser(description="Scrape the Oasi Tigre catalogue of one shop.")
+	parser.add_argument("--http", action="store_true", help="use the browser only to select the shop, fetch the categories over plain HTTP")
+	parser.add_argument("--resume", action="store_true", help="continue the interrupted run from its checkpoint")
+	args = parser.parse_args()
+
+	checkpoint = Checkpoint("tigre", resume=args.resume)
+	checkpoint.replay_pending()
+
 	all_shop = os.environ.get("ALL_SHOP_2")
 	count_shop = os.environ.get("COUNT_SHOP_2")
 
@@ -175,37 +264,54 @@ if __name__ == "__main__":
 		except IndexError:
 			print(f"Error: count_shop ({count_shop}) is out of range for the 'stores' list.")
 
-	options = uc.ChromeOptions()
-
-	options.binary_location = "/usr/bin/google-chrome"
-
-	options.add_argument("--headless")
-	options.add_argument("--no-sandbox")
-	options.add_argument("--disable-dev-shm-usage")
-
-	# Initialize the undetected Chrome driver
-	driver = uc.Chrome(options=options, use_subprocess=False)
-	total_items_processed = 0
-
-	change_shop_location(driver, shop['street'])
-
-	for category, items in categories_dict.items():
-		for item in items:
+	stats = load_stats()
+	categories = plan_categories(load_categories(), stats)
+	if not categories:
+		print("Error: no Oasi Tigre category to crawl.")
+		sys.exit(1)
+
+	driver = build_driver(headless=True)
+	meter = TransferMeter("tigre")
+
+	if not select_shop(driver, shop, categories[0]):
+		# The site would answer with its default store, whose products must not be filed under shop
+		print(f"Error: could not select the store {shop.get('street')}, nothing crawled.")
+		driver.quit()
+		checkpoint.close()
+		sys.exit(1)
+
+	# A resumed run only crawls the categories the interrupted one didn't send
+	remaining = [category for category in categories if not checkpoint.is_done(shop_key(shop), category_key(category))]
+	if len(remaining) < len(categories):
+		print(f"Resuming: {len(categories) - len(remaining)} categories already sent")
+	categories = remaining
+
+	if args.http:
+		# The browser is only needed to pick the store, pages are then fetched with its cookies
+		client = HttpClient()
+		copy_cookies_to_session(driver, client.session)
+		driver.quit()
+		counts = crawl_categories_http(shop, client, categories)
+	else:
+		counts = {}
+		for category, item in categories:
 			
-			product_url = f"https://oasitigre.it/it/spesa/reparti/{category}/{item}.html"
-
-			driver.get(product_url)
+			driver.get(category_url(category, item))
 			time.sleep(5)
+			meter.record(driver)
 
-			soup = BeautifulSoup(driver.page_source, 'html.parser')
-			all_products_contenir = soup.find_all('div', class_="aggregatore-prodotti js-aggregatore-cont")
-			
-			for products_contenir in all_products_contenir:
+			counts[(category, item)] = find_and_send_info(shop, (category, item), driver.page_source)
 
-				total_items_processed += find_and_send_info(shop, products_contenir)
+		driver.close()
 
+	if any(counts.values()):
+		record_counts(stats, counts)
+	elif counts:
+		# An empty run says more about the store selection than about the categories
+		print("No products found at all: category stats left unchanged, nothing gets pruned.")
+	total_items_processed = sum(counts.values())
 	print(f"Total items processed: {total_items_processed}")
+	meter.report()
+	checkpoint.close()
 	
 	update_env_with_dotenv(".env", "COUNT_SHOP_2", int(count_shop + 1))
-
-	driver.close()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import re
+import time
+import requests
+
+from utility_tigre import categories_dict
+from libft import get_client, read_category_cache, write_category_cache
+from libft.crawl_state import CRAWL_STATE_DIR
+
+# Category list of the Oasi Tigre crawler.
+# Reparti and sub-reparti are read from the links of the shop's navigation and cached for
+# TIGRE_CATEGORY_TTL; utility_tigre.categories_dict is only the fallback when the site can't be
+# read. The product count of every category is kept for the last TIGRE_HISTORY_RUNS runs:
+# categories that came back empty TIGRE_PRUNE_AFTER times in a row are skipped until their
+# last result is older than TIGRE_CATEGORY_TTL, and the rest are crawled biggest first.
+
+TIGRE_NAVIGATION_URL = os.getenv("TIGRE_NAVIGATION_URL", "https://oasitigre.it/it/spesa.html")
+TIGRE_CATEGORY_TTL = float(os.getenv("TIGRE_CATEGORY_TTL", 7 * 24 * 60 * 60))
+TIGRE_HISTORY_RUNS = int(os.getenv("TIGRE_HISTORY_RUNS", 5))
+TIGRE_PRUNE_AFTER = int(os.getenv("TIGRE_PRUNE_AFTER", 3))
+
+CATEGORIES_PATH = os.path.join(CRAWL_STATE_DIR, "tigre_categories.json")
+STATS_PATH = os.path.join(CRAWL_STATE_DIR, "tigre_category_stats.json")
+CATEGORY_LINK = re.compile(r"/it/spesa/reparti/([\w-]+)/([\w-]+)\.html")
+
+def discover_categories(html):
+	"""Returns {reparto: [sub-reparti]} from the category links of a page, in page order."""
+	categories = {}
+	for category, item in CATEGORY_LINK.findall(html):
+		items = categories.setdefault(category, [])
+		if item not in items:
+			items.append(item)
+	return categories
+
+# Returns the categories to consider, from the cache, the site navigation or categories_dict.
+
+def load_categories():
+	cache = read_category_cache(CATEGORIES_PATH)
+	if cache and time.time() - cache["discovered_at"] < TIGRE_CATEGORY_TTL:
+		return cache["categories"]
+
+	try:
+		response = get_client().get(TIGRE_NAVIGATION_URL)
+		categories = discover_categories(response.text) if response.status_code == 200 else {}
+	except requests.exceptions.RequestException as e:
+		print(f"Could not read the Oasi Tigre navigation: {e}")
+		categories = {}
+
+	if categories:
+		write_category_cache(CATEGORIES_PATH, {"discovered_at": time.time(), "categories": categories})
+		print(f"Discovered {sum(len(items) for items in categories.values())} Oasi Tigre categories")
+		return categories
+	if cache:
+		print("Using the expired Oasi Tigre category cache")
+		return cache["categories"]
+	print("Using the built-in Oasi Tigre category list")
+	return categories_dict
+
+def _key(category, item):
+	return f"{category}/{item}"
+
+def load_stats():
+	return read_category_cache(STATS_PATH) or {}
+
+def is_pruned(entry):
+	recent = entry["counts"][-TIGRE_PRUNE_AFTER:]
+	return (
+		len(recent) >= TIGRE_PRUNE_AFTER
+		and not any(recent)
+		and time.time() - entry["updated_at"] < TIGRE_CATEGORY_TTL
+	)
+
+# Returns: The (category, item) pairs to crawl, categories never crawled first, then by
+# average product count, highest first
+
+def plan_categories(categories, stats):
+	planned = []
+	pruned = 0
+	for category, items in categories.items():
+		for item in items:
+			entry = stats.get(_key(category, item))
+			if entry and is_pruned(entry):
+				pruned += 1
+				continue
+			average = sum(entry["counts"]) / len(entry["counts"]) if entry else float("inf")
+			planned.append((average, category, item))
+	planned.sort(key=lambda plan: -plan[0])
+	if pruned:
+		print(f"Skipping {pruned} Oasi Tigre categories empty in the last {TIGRE_PRUNE_AFTER} runs")
+	return [(category, item) for _, category, item in planned]
+
+def record_counts(stats, counts):
+	"""Appends this run's {(category, item): products} to the history and saves it."""
+	now = time.time()
+	for (category, item), count in counts.items():
+		entry = stats.setdefault(_key(category, item), {"counts": [], "updated_at": now})
+		entry["counts"] = (entry["counts"] + [count])[-TIGRE_HISTORY_RUNS:]
+		entry["updated_at"] = now
+	write_category_cache(STATS_PATH, stats)
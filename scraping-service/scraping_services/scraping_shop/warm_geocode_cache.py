@@ -0,0 +1,24 @@
+import os
+import sys
+import glob
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+try:
+	from libft import get_geocode_cache
+except ImportError:
+	print("Error: libft module not found. Please ensure it's in your PYTHONPATH or in the same directory.")
+	sys.exit(1)
+
+# Fills the geocode cache from the *_shop.csv backups written by the shop scrapers,
+# so the next store refresh only calls the Geocoding API for new addresses.
+# Usage: python3 scraping_shop/warm_geocode_cache.py [<shop.csv> ...]
+
+if __name__ == "__main__":
+	filenames = sys.argv[1:] or glob.glob("**/*_shop.csv", recursive=True)
+	if not filenames:
+		print("No *_shop.csv files found.")
+		sys.exit(1)
+
+	cache = get_geocode_cache()
+	for filename in filenames:
+		print(f"{filename}: {cache.warm_from_csv(filename)} addresses cached")
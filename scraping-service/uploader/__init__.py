@@ -0,0 +1,86 @@
+# Import from bulk_client.py
+from .bulk_client import (
+    BulkClient,
+    BATCH_SIZE,
+    BATCH_MAX_BYTES,
+    product_label,
+)
+
+# Import from in_flight.py
+from .in_flight import (
+    bounded_submit,
+    bounded_as_completed,
+)
+
+# Import from sources.py
+from .sources import (
+    iter_records,
+    open_input,
+    open_text,
+    JSON_BACKEND_NAME,
+    iter_csv_chunks,
+    iter_in_thread,
+    CSV_CHUNK_ROWS,
+    Source,
+    SOURCE_FORMATS,
+)
+
+# Import from transforms.py
+from .transforms import (
+    TRANSFORMS,
+    get_transform,
+)
+
+# Import from transports.py
+from .transports import (
+    ThreadedTransport,
+    AsyncTransport,
+    TRANSPORTS,
+    get_transport,
+)
+
+# Import from service.py
+from .service import (
+    setup_logging,
+    wait_for_service,
+)
+
+# Import from dedup.py
+from .dedup import (
+    Deduplicator,
+    product_key,
+    sanitize_string,
+)
+
+# Import from pipeline.py
+from .pipeline import run_upload
+
+__all__ = [
+    "BulkClient",
+    "BATCH_SIZE",
+    "BATCH_MAX_BYTES",
+    "product_label",
+    "bounded_submit",
+    "bounded_as_completed",
+    "iter_records",
+    "open_input",
+    "open_text",
+    "JSON_BACKEND_NAME",
+    "iter_csv_chunks",
+    "iter_in_thread",
+    "CSV_CHUNK_ROWS",
+    "Source",
+    "SOURCE_FORMATS",
+    "TRANSFORMS",
+    "get_transform",
+    "ThreadedTransport",
+    "AsyncTransport",
+    "TRANSPORTS",
+    "get_transport",
+    "setup_logging",
+    "wait_for_service",
+    "Deduplicator",
+    "product_key",
+    "sanitize_string",
+    "run_upload",
+]
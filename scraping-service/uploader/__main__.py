@@ -0,0 +1,64 @@
+import sys
+import json
+import logging
+import argparse
+
+from .bulk_client import BATCH_SIZE, PRODUCT_RECEIVER_BASE_URL, api_base_url
+from .dedup import DEDUP
+from .pipeline import run_upload
+from .service import setup_logging
+from .sources import SOURCE_FORMATS
+from .transforms import TRANSFORMS
+from .transports import MAX_RETRIES, TRANSPORTS
+
+# Command line of the uploader, e.g.:
+#   python -m uploader gros_products.json --transform gros-products
+#   python -m uploader gros_products.csv.gz --transform gros-products-csv --transport asyncio --progress
+# Prints the counters of the run as JSON; exits 1 if some records could not be sent or read.
+
+logger = logging.getLogger("uploader")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m uploader", description="Upload scraped products and stores to the product receiver.")
+    parser.add_argument("files", nargs="+", help="JSON, NDJSON or CSV files, optionally .gz/.zst")
+    parser.add_argument("--transform", required=True, help=f"one of {', '.join(TRANSFORMS)}, or module:function")
+    parser.add_argument("--format", choices=sorted(SOURCE_FORMATS), help="input format (default: from the extension)")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="threads")
+    parser.add_argument("--base-url", type=api_base_url, default=PRODUCT_RECEIVER_BASE_URL)
+    parser.add_argument("--workers", type=int, help="threads (threads) or open connections (asyncio)")
+    parser.add_argument("--max-in-flight", type=int, help="requests pending at most")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="products per /products/bulk request, 0 for one request per product")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--no-dedup", action="store_true", help="send every product as it is read, duplicates included "
+                        "(by default no product is sent before the whole input has been read)")
+    parser.add_argument("--no-wait", action="store_true", help="don't wait for /health before sending")
+    parser.add_argument("--progress", action="store_true", help="show a progress bar per file")
+    parser.add_argument("--log-file")
+    parser.add_argument("--error-log-file")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_file, args.error_log_file, level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        stats = run_upload(
+            args.files,
+            args.transform,
+            transport=args.transport,
+            fmt=args.format,
+            wait=not args.no_wait,
+            progress=args.progress,
+            dedup=DEDUP and not args.no_dedup,
+            base_url=args.base_url,
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            batch_size=args.batch_size,
+            max_retries=args.max_retries,
+        )
+    except (TimeoutError, ValueError) as e:
+        logger.error(e)
+        return 2
+    print(json.dumps(stats))
+    return 1 if stats["failed"] or stats["unreadable"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import logging
+import threading
+import requests
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.exceptions import RequestException
+
+# Client of the product-receiver bulk endpoint (POST /api/products/bulk).
+# Products are encoded once as they are added and grouped in batches of at most BATCH_SIZE
+# products and BATCH_MAX_BYTES of JSON; each batch is one request instead of one per product.
+# The receiver answers with a status per product: 'invalid' ones are logged and dropped,
+# 'failed' ones are resent with the next attempts. A receiver without the bulk endpoint (404)
+# gets the products one by one on /api/product.
+# Up to BULK_IN_FLIGHT batches are sent at once; adding to a full window waits for one of them
+# to finish, so the reader never gets more than that many batches ahead of the receiver.
+
+def api_base_url(url: str) -> str:
+    """The receiver's routes live under /api; older .env files give just the host."""
+    url = url.rstrip("/")
+    return url if url.endswith("/api") else url + "/api"
+
+PRODUCT_RECEIVER_BASE_URL = api_base_url(os.getenv("PRODUCT_RECEIVER_BASE_URL", "http://localhost:3002/api"))
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", 500))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", 1024 * 1024))
+BULK_MAX_RETRIES = int(os.getenv("BULK_MAX_RETRIES", os.getenv("MAX_RETRIES", 5)))
+BULK_BACKOFF_FACTOR = float(os.getenv("BULK_BACKOFF_FACTOR", os.getenv("BACKOFF_FACTOR", 2)))
+BULK_TIMEOUT = float(os.getenv("BULK_TIMEOUT", 120))
+BULK_IN_FLIGHT = int(os.getenv("BULK_IN_FLIGHT", 2))
+
+BULK_ENDPOINT = "products/bulk"
+PRODUCT_ENDPOINT = "product"
+
+logger = logging.getLogger(__name__)
+
+def product_label(product: dict) -> str:
+    return product.get("full_name") or product.get("name") or "?"
+
+class BulkClient:
+    """Buffers products and sends them in size- and byte-bounded batches."""
+
+    def __init__(
+        self,
+        base_url: str = PRODUCT_RECEIVER_BASE_URL,
+        batch_size: int = BATCH_SIZE,
+        max_bytes: int = BATCH_MAX_BYTES,
+        max_retries: int = BULK_MAX_RETRIES,
+        backoff_factor: float = BULK_BACKOFF_FACTOR,
+        session: requests.Session = None,
+        max_in_flight: int = BULK_IN_FLIGHT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = max(1, batch_size)
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.session = session or requests.Session()
+        self.sent = 0
+        self.invalid = 0
+        self.failed = 0
+        self.requests = 0
+        self._bulk_supported = True
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._lock = threading.Lock()
+        self.max_in_flight = max(1, max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight) if self.max_in_flight > 1 else None
+        self._in_flight = set()
+
+    def add(self, product: dict):
+        encoded = json.dumps(product, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if self._buffer and (len(self._buffer) >= self.batch_size or self._buffer_bytes + len(encoded) > self.max_bytes):
+            self.flush()
+        self._buffer.append((product, encoded))
+        self._buffer_bytes += len(encoded) + 1
+
+    def flush(self):
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        if not batch:
+            return
+        if self._executor is None:
+            self.send_batch(batch)
+            return
+        if len(self._in_flight) >= self.max_in_flight:
+            self._wait_in_flight(FIRST_COMPLETED)
+        self._in_flight.add(self._executor.submit(self.send_batch, batch))
+
+    def _wait_in_flight(self, return_when):
+        done, self._in_flight = wait(self._in_flight, return_when=return_when)
+        for future in done:
+            # send_batch handles the receiver's errors, anything raised here is a bug
+            future.result()
+
+    def close(self) -> dict:
+        """Sends what is buffered and waits for the batches in flight. Returns: The counters of the run."""
+        self.flush()
+        if self._executor is not None:
+            self._wait_in_flight(ALL_COMPLETED)
+            self._executor.shutdown()
+        stats = {"sent": self.sent, "invalid": self.invalid, "failed": self.failed, "requests": self.requests}
+        logger.info(
+            f"Bulk upload: {self.sent} products sent, {self.invalid} invalid, {self.failed} failed, "
+            f"{self.requests} requests"
+        )
+        return stats
+
+    def send_batch(self, batch: list):
+        """Sends [(product, encoded product)], retrying the products the receiver failed to save."""
+        attempt = 0
+        while batch and self._bulk_supported:
+            status, results = self._post_batch(batch)
+            if status == 404:
+                logger.warning("Bulk endpoint not available, falling back to one request per product")
+                self._bulk_supported = False
+                break
+            if status == 200:
+                batch = self._retryable(batch, results)
+                if not batch:
+                    return
+            elif status is not None and 400 <= status < 500:
+                logger.error(f"Batch of {len(batch)} products rejected with HTTP {status}")
+                self._count("failed", len(batch))
+                return
+            attempt += 1
+            if attempt >= self.max_retries:
+                for product, _ in batch:
+                    logger.error(f"Failed to send after {self.max_retries} attempts: {product_label(product)}")
+                self._count("failed", len(batch))
+                return
+            delay = self.backoff_factor ** attempt
+            logger.warning(f"{len(batch)} products not saved, attempt {attempt}/{self.max_retries}, retrying in {delay}s")
+            time.sleep(delay)
+
+        for product, _ in batch:
+            self._send_one(product)
+
+    def _count(self, counter: str, amount: int):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _post_batch(self, batch: list):
+        body = b'{"products":[' + b",".join(encoded for _, encoded in batch) + b"]}"
+        self._count("requests", 1)
+        try:
+            response = self.session.post(
+                f"{self.base_url}/{BULK_ENDPOINT}",
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=BULK_TIMEOUT,
+            )
+        except RequestException as e:
+            logger.warning(f"Network error sending a batch of {len(batch)} products: {e}")
+            return None, None
+        if response.status_code != 200:
+            return response.status_code, None
+        try:
+            return 200, response.json().get("results", [])
+        except ValueError:
+            return None, None
+
+    def _retryable(self, batch: list, results: list) -> list:
+        # Returns the products of batch to send again, counting the others
+        retry = []
+        statuses = {result.get("index"): result for result in results}
+        for index, item in enumerate(batch):
+            result = statuses.get(index, {"status": "failed", "error": "missing from the response"})
+            if result["status"] in ("created", "updated"):
+                self._count("sent", 1)
+            elif result["status"] == "invalid":
+                self._count("invalid", 1)
+                logger.warning(f"Invalid product {product_label(item[0])}: {result.get('error')}")
+            else:
+                retry.append(item)
+        return retry
+
+    def _send_one(self, product: dict):
+        for attempt in range(1, self.max_retries + 1):
+            self._count("requests", 1)
+            try:
+                response = self.session.post(f"{self.base_url}/{PRODUCT_ENDPOINT}", json=product, timeout=BULK_TIMEOUT)
+                if response.status_code in (200, 201):
+                    self._count("sent", 1)
+                    return
+                if 400 <= response.status_code < 500:
+                    self._count("invalid", 1)
+                    logger.warning(f"Invalid product {product_label(product)}: HTTP {response.status_code} {response.text}")
+                    return
+            except RequestException as e:
+                logger.warning(f"Network error sending {product_label(product)}: {e}")
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_factor ** attempt)
+        self._count("failed", 1)
+        logger.error(f"Failed to send after {self.max_retries} attempts: {product_label(product)}")
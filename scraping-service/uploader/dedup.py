@@ -0,0 +1,122 @@
+import os
+import re
+import json
+import sqlite3
+import logging
+import tempfile
+from typing import Iterable, Iterator
+
+from .bulk_client import PRODUCT_ENDPOINT
+
+# De-duplication of the products of an upload, before they are sent.
+# The receiver upserts a product on (name_id, localization), name_id being sanitizeString of
+# full_name (or name) in routes.ts and the localization unique on (grocery, lat, lng, street):
+# every repeat of the same product at the same place costs a transaction and a ProductHistory row
+# for nothing. The dumps repeat products a lot (hence find_duplicates_in_*.py), so only the last
+# record per key is sent.
+# Keeping the last record means holding the products until the input is read: up to
+# DEDUP_MEMORY_KEYS in a dict, beyond that in a temporary sqlite table under DEDUP_DIR.
+# Stores and other endpoints go through as they come.
+
+DEDUP = os.getenv("UPLOAD_DEDUP", "1") not in ("0", "false", "no")
+DEDUP_MEMORY_KEYS = int(os.getenv("DEDUP_MEMORY_KEYS", 20000))
+DEDUP_DIR = os.getenv("DEDUP_DIR") or None
+
+logger = logging.getLogger(__name__)
+
+def sanitize_string(value) -> str:
+    """Python version of the receiver's sanitizeString, which builds name_id."""
+    value = re.sub(r"[^a-z0-9\s]", "", str(value).lower())
+    return re.sub(r"_+$", "", re.sub(r"\s+", "_", value))
+
+def product_key(product: dict) -> tuple:
+    """The receiver's upsert key of a product: name_id and the localization's unique fields."""
+    localization = product.get("localization") or {}
+    return (
+        sanitize_string(product.get("full_name") or product.get("name") or ""),
+        localization.get("grocery"),
+        localization.get("lat"),
+        localization.get("lng"),
+        localization.get("street"),
+    )
+
+class Deduplicator:
+    """Filters (endpoint, payload) items down to the last product per product_key."""
+
+    def __init__(self, max_memory_keys: int = DEDUP_MEMORY_KEYS, spill_dir: str = DEDUP_DIR):
+        self.max_memory_keys = max(1, max_memory_keys)
+        self.spill_dir = spill_dir
+        self.products = 0
+        self.unique = 0
+        self.spilled = False
+
+    @property
+    def duplicates(self) -> int:
+        return self.products - self.unique
+
+    def __call__(self, items: Iterable) -> Iterator:
+        """
+        Yields the non-product items as they come, then the last record of every product key
+        once items is exhausted.
+        """
+        latest = {}
+        db = None
+        path = None
+        pending = []
+        try:
+            for endpoint, payload in items:
+                if endpoint != PRODUCT_ENDPOINT:
+                    yield endpoint, payload
+                    continue
+                self.products += 1
+                key = product_key(payload)
+                if db is None:
+                    latest[key] = payload
+                    if len(latest) > self.max_memory_keys:
+                        db, path = self._spill(latest)
+                        latest = {}
+                    continue
+                pending.append((json.dumps(key), json.dumps(payload)))
+                if len(pending) >= 1000:
+                    db.executemany("INSERT OR REPLACE INTO products VALUES (?, ?)", pending)
+                    pending = []
+
+            if db is None:
+                self.unique = len(latest)
+                self._report()
+                for payload in latest.values():
+                    yield PRODUCT_ENDPOINT, payload
+                return
+            db.executemany("INSERT OR REPLACE INTO products VALUES (?, ?)", pending)
+            self.unique = db.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            self._report()
+            for (payload,) in db.execute("SELECT payload FROM products ORDER BY rowid"):
+                yield PRODUCT_ENDPOINT, json.loads(payload)
+        finally:
+            if db is not None:
+                db.close()
+                os.remove(path)
+
+    def _spill(self, latest: dict):
+        # Moves the keys held so far to a temporary sqlite table that takes the rest
+        fd, path = tempfile.mkstemp(prefix="uploader-dedup-", suffix=".sqlite", dir=self.spill_dir)
+        os.close(fd)
+        # The items can be read from different threads (AsyncTransport), one at a time
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute("CREATE TABLE products (key TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+        db.executemany(
+            "INSERT INTO products VALUES (?, ?)",
+            ((json.dumps(key), json.dumps(payload)) for key, payload in latest.items()),
+        )
+        self.spilled = True
+        logger.info(f"More than {self.max_memory_keys} distinct products, de-duplicating on disk in {path}")
+        return db, path
+
+    def _report(self):
+        if self.products:
+            logger.info(
+                f"De-duplication: {self.products} products, {self.unique} distinct, "
+                f"{self.duplicates} duplicates not sent ({self.duplicates} upserts saved)"
+            )
@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+# Bounded in-flight windows for the uploaders.
+# Submitting every record of a file up front keeps one future (and its record) per row in
+# memory, so reading the input stays ahead of the network for the whole file. These helpers
+# submit at most max_in_flight calls, stop pulling from the input while the window is full and
+# hand results back as they complete, so memory depends on the window and not on the file.
+
+def bounded_submit(executor, calls: Iterable[tuple], max_in_flight: int) -> Iterator[Any]:
+    """
+    Submits each (fn, *args) of calls to executor, with at most max_in_flight pending.
+    Yields the futures as they complete; calls is only advanced when a slot is free.
+    """
+    max_in_flight = max(1, max_in_flight)
+    in_flight = set()
+    for fn, *args in calls:
+        if len(in_flight) >= max_in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from done
+        in_flight.add(executor.submit(fn, *args))
+    while in_flight:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        yield from done
+
+async def _as_async_iterator(iterable):
+    for item in iterable:
+        yield item
+
+async def bounded_as_completed(coroutines, max_in_flight: int) -> AsyncIterator[asyncio.Task]:
+    """
+    Schedules the coroutines of a (sync or async) iterable as tasks, at most max_in_flight at
+    a time. Yields the finished tasks; the iterable is only advanced when a slot is free.
+    """
+    max_in_flight = max(1, max_in_flight)
+    if not hasattr(coroutines, "__aiter__"):
+        coroutines = _as_async_iterator(coroutines)
+    in_flight = set()
+    async for coroutine in coroutines:
+        if len(in_flight) >= max_in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task
+        in_flight.add(asyncio.ensure_future(coroutine))
+    while in_flight:
+        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task
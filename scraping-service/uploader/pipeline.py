@@ -0,0 +1,85 @@
+import os
+import csv
+import logging
+import ijson
+from tqdm import tqdm
+
+from .dedup import DEDUP, Deduplicator
+from .service import wait_for_service
+from .sources import Source
+from .transforms import get_transform
+from .transports import get_transport
+
+# run_upload wires the stages of an upload: a Source (what is read), a transform (what is sent
+# for each record), the de-duplication of the products and a transport (how it is sent).
+# python -m uploader and the send_* scripts are thin layers over it, so concurrency, batching
+# and retries are tuned in one place. All the files of a run go through one stream of items,
+# so duplicates are also found across files.
+
+logger = logging.getLogger(__name__)
+
+def transformed(source: Source, transform, stats: dict, progress=None):
+    """Yields the (endpoint, payload) items of source, counting read and skipped records."""
+    try:
+        for chunk in source.chunks():
+            for record in chunk:
+                stats["records"] += 1
+                item = transform(record)
+                if item is None:
+                    stats["skipped"] += 1
+                else:
+                    yield item
+            if progress is not None:
+                progress.update(source.bytes_read - progress.n)
+    except (OSError, ValueError, csv.Error, ijson.JSONError) as e:
+        logger.error(f"Error reading {source.path}: {e}")
+        stats["unreadable"] += 1
+
+def run_upload(
+    paths,
+    transform,
+    transport="threads",
+    fmt: str = None,
+    wait: bool = True,
+    progress: bool = False,
+    dedup: bool = DEDUP,
+    **transport_options,
+) -> dict:
+    """
+    Uploads every file of paths. transform and transport are names (see TRANSFORMS and
+    TRANSPORTS) or objects; transport_options go to the transport's constructor.
+    Returns: The counters of the run (records, skipped, duplicates, sent, invalid, failed...).
+    """
+    if isinstance(transform, str):
+        transform = get_transform(transform)
+    if isinstance(transport, str):
+        transport = get_transport(transport, **transport_options)
+    if wait:
+        wait_for_service(transport.base_url)
+
+    stats = {"records": 0, "skipped": 0, "unreadable": 0, "duplicates": 0}
+
+    def items():
+        for path in paths:
+            if not os.path.exists(path):
+                logger.error(f"File not found: {path}")
+                stats["unreadable"] += 1
+                continue
+            source = Source(path, fmt)
+            logger.info(f"Uploading {path} ({source.format}) with {type(transport).__name__}")
+            bar = tqdm(total=source.size, unit="B", unit_scale=True, desc=os.path.basename(path)) if progress else None
+            yield from transformed(source, transform, stats, bar)
+            if bar is not None:
+                bar.close()
+
+    deduplicator = Deduplicator() if dedup else None
+    transport.send(deduplicator(items()) if deduplicator else items())
+    if deduplicator is not None:
+        stats["duplicates"] = deduplicator.duplicates
+
+    stats.update(transport.stats)
+    logger.info(
+        f"Upload done: {stats['records']} records, {stats['skipped']} skipped, {stats['duplicates']} duplicates, "
+        f"{stats['sent']} sent, {stats['invalid']} rejected, {stats['failed']} failed, {stats['requests']} requests"
+    )
+    return stats
@@ -0,0 +1,55 @@
+import time
+import logging
+import requests
+from requests.exceptions import RequestException
+
+from .bulk_client import PRODUCT_RECEIVER_BASE_URL
+
+# Logging and readiness check shared by the uploader CLI and the send_* scripts.
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+logger = logging.getLogger(__name__)
+
+def setup_logging(
+    log_file: str = None,
+    error_log_file: str = None,
+    level: int = logging.INFO,
+    console: bool = True,
+    rejects_log_file: str = None,
+):
+    """
+    Logs to log_file and/or the console; errors also go to error_log_file, and the records the
+    transforms skip to rejects_log_file.
+    """
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    if console:
+        handlers.append(logging.StreamHandler())
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers or [logging.NullHandler()])
+    for path, logger_name, handler_level in (
+        (error_log_file, None, logging.ERROR),
+        (rejects_log_file, "uploader.transforms", logging.WARNING),
+    ):
+        if path:
+            handler = logging.FileHandler(path)
+            handler.setLevel(handler_level)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            logging.getLogger(logger_name).addHandler(handler)
+
+def wait_for_service(base_url: str = PRODUCT_RECEIVER_BASE_URL, endpoint: str = "health", timeout: int = 60):
+    """Polls base_url/endpoint until it answers 200. Raises TimeoutError after timeout seconds."""
+    url = f"{base_url.rstrip('/')}/{endpoint}"
+    logger.info(f"Waiting for {url}...")
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        try:
+            if requests.get(url, timeout=10).status_code == 200:
+                logger.info(f"{url} is ready.")
+                return
+        except RequestException:
+            pass
+        logger.debug(f"{url} not ready, retrying in 5 seconds...")
+        time.sleep(5)
+    raise TimeoutError(f"{url} not ready within {timeout} seconds.")
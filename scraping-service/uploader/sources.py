@@ -0,0 +1,173 @@
+import io
+import os
+import csv
+import gzip
+import asyncio
+import ijson
+from typing import Any, AsyncIterator, BinaryIO, Iterable, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Streaming readers for the uploaders' input files.
+# The files are read record by record whatever their size: a JSON array is parsed incrementally
+# with ijson (its C backend when the yajl2 library is there), NDJSON and concatenated objects line
+# by line through the same parser, and .gz / .zst inputs are decompressed on the fly. Compression
+# is detected from the first bytes, so a renamed file still opens.
+# Numbers come back as float, not Decimal, so records can go to json.dumps as they are.
+# CSV files are read in one pass, in chunks of CSV_CHUNK_ROWS rows tagged with the bytes of the
+# file read so far, so progress can be shown without counting the lines first; JSON inputs can be
+# read the same way. Source wraps both behind one iterable for the upload pipeline.
+
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", 1000))
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def _json_backend():
+    # ijson picks yajl2_c by default when built; be explicit and fall back to the pure python one
+    for name in ("yajl2_c", "yajl2_cffi", "yajl2"):
+        try:
+            return ijson.get_backend(name)
+        except ImportError:
+            continue
+    return ijson
+
+JSON_BACKEND = _json_backend()
+JSON_BACKEND_NAME = getattr(JSON_BACKEND, "backend_name", "python")
+
+def open_input(path: str) -> BinaryIO:
+    """Opens path for binary reading, decompressing gzip and zstd inputs on the fly."""
+    raw = open(path, "rb")
+    magic = raw.read(4)
+    raw.seek(0)
+    if magic.startswith(GZIP_MAGIC):
+        raw.close()
+        return gzip.open(path, "rb")
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raw.close()
+            raise OSError(f"{path} is zstd-compressed: install the 'zstandard' package to read it")
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return raw
+
+def open_text(path: str, encoding: str = "utf-8") -> io.TextIOBase:
+    """Text version of open_input, for the CSV readers."""
+    return io.TextIOWrapper(open_input(path), encoding=encoding, newline="")
+
+def _first_significant_byte(stream: io.BufferedReader) -> bytes:
+    # Looks past leading whitespace, only consuming whitespace
+    while True:
+        chunk = stream.peek(64)
+        if not chunk:
+            return b""
+        stripped = chunk.lstrip(b" \t\r\n")
+        if stripped:
+            return stripped[:1]
+        stream.read(len(chunk))
+
+def _json_records(source) -> Iterator[Any]:
+    stream = io.BufferedReader(source) if not hasattr(source, "peek") else source
+    first = _first_significant_byte(stream)
+    if first == b"[":
+        yield from JSON_BACKEND.items(stream, "item", use_float=True)
+    elif first:
+        yield from JSON_BACKEND.items(stream, "", multiple_values=True, use_float=True)
+
+def iter_records(path: str) -> Iterator[Any]:
+    """
+    Yields the records of a JSON array, NDJSON or concatenated-JSON file, compressed or not.
+    A file holding one top-level object yields that object.
+    """
+    with open_input(path) as source:
+        yield from _json_records(source)
+
+def _bytes_read(stream) -> Optional[int]:
+    # Position in the file on disk (compressed bytes for .gz), None when it can't be known
+    try:
+        return os.lseek(stream.fileno(), 0, os.SEEK_CUR)
+    except (OSError, AttributeError, ValueError, io.UnsupportedOperation):
+        return None
+
+def iter_csv_chunks(path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[tuple]:
+    """
+    Reads a CSV (compressed or not) once, yielding (rows, bytes read) with up to chunk_rows
+    DictReader rows per chunk. Compare bytes read to os.path.getsize(path) for progress.
+    """
+    chunk_rows = max(1, chunk_rows)
+    with open_text(path) as text:
+        rows = []
+        for row in csv.DictReader(text):
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                yield rows, _bytes_read(text.buffer)
+                rows = []
+        if rows:
+            yield rows, _bytes_read(text.buffer)
+
+def iter_json_chunks(path: str, chunk_size: int = CSV_CHUNK_ROWS) -> Iterator[tuple]:
+    """JSON / NDJSON counterpart of iter_csv_chunks: yields (records, bytes read)."""
+    chunk_size = max(1, chunk_size)
+    with open_input(path) as source:
+        records = []
+        for record in _json_records(source):
+            records.append(record)
+            if len(records) >= chunk_size:
+                yield records, _bytes_read(source)
+                records = []
+        if records:
+            yield records, _bytes_read(source)
+
+# Readers by input format; Source picks one from the file extension unless told otherwise
+SOURCE_FORMATS = {
+    "csv": iter_csv_chunks,
+    "json": iter_json_chunks,
+    "ndjson": iter_json_chunks,
+}
+
+def detect_format(path: str) -> str:
+    name = path.lower()
+    for suffix in (".gz", ".zst", ".zstd"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return "csv" if name.endswith(".csv") else "json"
+
+class Source:
+    """The records of one input file, read in chunks; bytes_read out of size gives the progress."""
+
+    def __init__(self, path: str, fmt: str = None, chunk_size: int = CSV_CHUNK_ROWS):
+        self.path = path
+        self.format = fmt or detect_format(path)
+        if self.format not in SOURCE_FORMATS:
+            raise ValueError(f"Unknown input format {self.format!r}, expected one of {sorted(SOURCE_FORMATS)}")
+        self.chunk_size = chunk_size
+        self.size = os.path.getsize(path)
+        self.bytes_read = 0
+
+    def chunks(self) -> Iterator[list]:
+        for records, bytes_read in SOURCE_FORMATS[self.format](self.path, self.chunk_size):
+            if bytes_read is not None:
+                self.bytes_read = bytes_read
+            yield records
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self.chunks():
+            yield from chunk
+
+async def iter_in_thread(iterable: Iterable) -> AsyncIterator[Any]:
+    """
+    Runs a blocking iterable (e.g. iter_csv_chunks) in a worker thread and yields its items on
+    the event loop. The next item is produced while the current one is being used.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+    end = object()
+    pending = loop.run_in_executor(None, next, iterator, end)
+    while True:
+        item = await pending
+        if item is end:
+            return
+        pending = loop.run_in_executor(None, next, iterator, end)
+        yield item
@@ -0,0 +1,168 @@
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from .dedup import sanitize_string
+
+# Local stand-in for the product-receiver-service, to try the uploaders without Postgres and
+# Logstash. It answers the same routes (health, product, products/bulk, store) with the same
+# status codes, checks the fields the receiver's zod schema requires, and keeps the products in
+# memory under the receiver's upsert key (name_id, grocery, lat, lng, street).
+# GET /api/stats returns the counters. Run it with:
+#   python -m uploader.stand_in_receiver --port 3002 [--no-bulk] [--latency-ms 5]
+
+def product_errors(product) -> list:
+    if not isinstance(product, dict):
+        return ["not an object"]
+    errors = []
+    if not isinstance(product.get("full_name"), str) or not product["full_name"]:
+        errors.append("full_name is required")
+    price = product.get("price")
+    if not isinstance(price, (int, float)) or isinstance(price, bool) or price < 0:
+        errors.append("price must be a number >= 0")
+    localization = product.get("localization")
+    if not isinstance(localization, dict):
+        return errors + ["localization is required"]
+    if not localization.get("grocery"):
+        errors.append("grocery is required")
+    for field in ("lat", "lng"):
+        if not isinstance(localization.get(field), (int, float)):
+            errors.append(f"{field} must be a number")
+    if not localization.get("street"):
+        errors.append("street is required")
+    return errors
+
+class StandInState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.products = {}
+        self.stores = 0
+        self.requests = 0
+        self.created = 0
+        self.updated = 0
+        self.invalid = 0
+
+    def upsert(self, product: dict) -> tuple:
+        localization = product["localization"]
+        key = (
+            sanitize_string(product.get("full_name") or product.get("name")),
+            localization["grocery"], localization["lat"], localization["lng"], localization["street"],
+        )
+        with self.lock:
+            action = "updated" if key in self.products else "created"
+            if action == "created":
+                self.created += 1
+                product_id = self.created
+            else:
+                self.updated += 1
+                product_id = self.products[key][0]
+            self.products[key] = (product_id, product)
+        return product_id, action
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "products": len(self.products),
+                "created": self.created,
+                "updated": self.updated,
+                "invalid": self.invalid,
+                "stores": self.stores,
+            }
+
+class StandInHandler(BaseHTTPRequestHandler):
+    state = None
+    bulk = True
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        if self.path == "/api/health":
+            self._reply(200, {"status": "OK"})
+        elif self.path == "/api/stats":
+            self._reply(200, self.state.stats())
+        else:
+            self._reply(404, {"error": "Not found"})
+
+    def do_POST(self):
+        with self.state.lock:
+            self.state.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body = self._read_json()
+
+        if self.path == "/api/product":
+            errors = product_errors(body)
+            if errors:
+                with self.state.lock:
+                    self.state.invalid += 1
+                return self._reply(400, {"error": "Validation error", "details": errors})
+            product_id, action = self.state.upsert(body)
+            return self._reply(201, {"message": "Product saved", "product": dict(body, id=product_id), "action": action})
+
+        if self.path == "/api/products/bulk" and self.bulk:
+            products = body.get("products") if isinstance(body, dict) else None
+            if not isinstance(products, list) or not products:
+                return self._reply(400, {"error": "Validation error", "details": ["products must be a non-empty array"]})
+            results = []
+            for index, product in enumerate(products):
+                errors = product_errors(product)
+                if errors:
+                    with self.state.lock:
+                        self.state.invalid += 1
+                    results.append({"index": index, "status": "invalid", "error": errors})
+                else:
+                    product_id, action = self.state.upsert(product)
+                    results.append({"index": index, "status": action, "id": product_id})
+            saved = sum(1 for result in results if result["status"] != "invalid")
+            return self._reply(200, {"saved": saved, "failed": len(results) - saved, "results": results})
+
+        if self.path == "/api/store":
+            with self.state.lock:
+                self.state.stores += 1
+            return self._reply(201, {"message": "Store saved", "action": "created"})
+
+        self._reply(404, {"error": "Not found"})
+
+def serve(port: int, bulk: bool = True, latency_ms: float = 0.0):
+    StandInHandler.state = StandInState()
+    StandInHandler.bulk = bulk
+    StandInHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    print(f"Stand-in receiver on http://127.0.0.1:{port}/api (bulk {'on' if bulk else 'off'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(StandInHandler.state.stats()))
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the product receiver.")
+    parser.add_argument("--port", type=int, default=3002)
+    parser.add_argument("--no-bulk", action="store_true", help="answer 404 on /api/products/bulk like an older receiver")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every POST")
+    args = parser.parse_args()
+    serve(args.port, bulk=not args.no_bulk, latency_ms=args.latency_ms)
+    sys.exit(0)
@@ -0,0 +1,212 @@
+import ast
+import json
+import logging
+import importlib
+from decimal import Decimal
+from typing import Any, Callable, Optional, Tuple
+
+from .bulk_client import PRODUCT_ENDPOINT
+
+# Transforms turn one input record into what goes to the receiver: (endpoint, payload), or None
+# to skip the record. They are the per-source normalisations the send_* scripts used to carry
+# each in its own copy; skipped records are logged at WARNING on this module's logger.
+# TRANSFORMS names them for the CLI; get_transform also takes "module:function" for new ones.
+
+STORE_ENDPOINT = "store"
+
+logger = logging.getLogger(__name__)
+
+Item = Optional[Tuple[str, dict]]
+
+def _float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+def _street(value: Any) -> str:
+    # The receiver requires street; the dumps often don't have it
+    return str(value or "unknown").strip() or "unknown"
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+def parse_working_hours(value: Any) -> str:
+    """Working hours as a JSON string; the scrapers write them as Python literals."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if not value:
+        return ""
+    try:
+        return json.dumps(ast.literal_eval(value))
+    except (ValueError, SyntaxError):
+        logger.warning(f"Unparsable working_hours: {value}")
+        return value
+
+def convert_decimals(obj: Any) -> Any:
+    """Decimal -> float, recursively (older ijson versions and backends return Decimal)."""
+    if isinstance(obj, list):
+        return [convert_decimals(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: convert_decimals(value) for key, value in obj.items()}
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return obj
+
+def store(record: dict) -> Item:
+    """Store dumps (gros_shop.json, oasi_tigre_shop.json) -> /store."""
+    record = convert_decimals(record)
+    if "long" in record:
+        record["lng"] = record.pop("long")
+    for field in ("name", "lat", "lng"):
+        if record.get(field) in (None, ""):
+            logger.warning(f"Store without {field}: {record}")
+            return None
+    try:
+        lat, lng = float(record["lat"]), float(record["lng"])
+    except (ValueError, TypeError):
+        logger.warning(f"Store with invalid coordinates: {record}")
+        return None
+    return STORE_ENDPOINT, {
+        "name": record["name"],
+        "lat": lat,
+        "lng": lng,
+        "street": record.get("street") or "",
+        "city": record.get("city") or "",
+        "working_hours": parse_working_hours(record.get("working_hours")),
+        "picks_up_in_shop": _bool(record.get("picks_up_in_shop", False)),
+        "zip_code": record.get("zip_code") or "",
+    }
+
+def gros_record(record: dict) -> Item:
+    """gros_products.json entries: products, plus the stores mixed into the same dump."""
+    if not isinstance(record, dict):
+        logger.warning(f"Not an object: {record}")
+        return None
+    if "street" in record and "picks_up_in_shop" in record:
+        return store(record)
+    if "price" not in record or "localization" not in record:
+        logger.warning(f"Neither a store nor a product: {record}")
+        return None
+    product = convert_decimals(record)
+    if not product.get("full_name") and not product.get("name"):
+        logger.warning(f"Product without name: {product}")
+        return None
+    localization = product["localization"]
+    if "long" in localization:
+        localization["lng"] = localization.pop("long")
+    localization["street"] = _street(localization.get("street"))
+    product.setdefault("discount", 0.0)
+    return PRODUCT_ENDPOINT, product
+
+def gros_csv_row(row: dict) -> Item:
+    """gros_products.csv rows, with dotted localization.* columns."""
+    try:
+        product = {
+            "full_name": (row.get("full_name") or "").strip(),
+            "name": (row.get("name") or "").strip(),
+            "description": (row.get("description") or "").strip() or None,
+            "price": float(row.get("price") or 0),
+            "discount": _float(row.get("discount")),
+            "price_for_kg": _float(row.get("price_for_kg")),
+            "localization": {
+                "grocery": (row.get("localization.grocery") or "").strip(),
+                "lat": float(row.get("localization.lat") or 0),
+                "lng": float(row.get("localization.lng") or 0),
+                "street": _street(row.get("localization.street")),
+            },
+            "img_url": (row.get("img_url") or "").strip() or None,
+        }
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Invalid row {row}: {e}")
+        return None
+    return PRODUCT_ENDPOINT, product
+
+def tigre_product(record: dict) -> Item:
+    """oasi_tigre_products.json entries; price, localization and img_url are required."""
+    if not isinstance(record, dict) or not record:
+        logger.warning(f"Empty product: {record}")
+        return None
+    product = convert_decimals(record)
+    missing = [field for field in ("price", "localization", "img_url") if not product.get(field)]
+    if missing:
+        logger.warning(f"Product without {missing}: {product}")
+        return None
+    name = (product.get("name") or "").strip()
+    full_name = (product.get("full_name") or "").strip()
+    if not name and not full_name:
+        logger.warning(f"Product without name and full_name: {product}")
+        return None
+    product["name"] = name or full_name
+    product["full_name"] = full_name or name
+    try:
+        product["price"] = float(product["price"])
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid price: {product}")
+        return None
+    product["discount"] = _float(product.get("discount"))
+    product["price_for_kg"] = _float(product.get("price_for_kg"))
+
+    localization = product["localization"]
+    if "long" in localization:
+        localization["lng"] = localization.pop("long")
+    try:
+        lat, lng = float(localization["lat"]), float(localization["lng"])
+    except (ValueError, TypeError, KeyError):
+        logger.warning(f"Invalid localization: {product}")
+        return None
+    if not localization.get("grocery"):
+        logger.warning(f"Product without grocery: {product}")
+        return None
+    product["localization"] = {
+        "grocery": localization["grocery"].strip(),
+        "lat": lat,
+        "lng": lng,
+        "street": _street(localization.get("street")),
+    }
+    product["description"] = (product.get("description") or "").strip()
+    if "quantity" in product:
+        product["quantity"] = str(product["quantity"]).strip()
+    product["img_url"] = str(product["img_url"]).strip()
+    return PRODUCT_ENDPOINT, product
+
+def tigre_csv_row(row: dict) -> Item:
+    """oasi_tigre_products.csv rows; unparsable numbers fall back to 0."""
+    product = {
+        "name": (row.get("name") or "").strip(),
+        "full_name": (row.get("full_name") or "").strip(),
+        "img_url": (row.get("img_url") or "").strip(),
+        "description": row.get("description") or "",
+        "price": _float(row.get("price")),
+        "discount": _float(row.get("discount")),
+        "price_for_kg": _float(row.get("price_for_kg")),
+        "localization": {
+            "grocery": (row.get("localization.grocery") or "").strip(),
+            "lat": _float(row.get("localization.lat")),
+            "lng": _float(row.get("localization.lng")),
+            "street": _street(row.get("localization.street")),
+        },
+    }
+    if not product["full_name"] and not product["name"]:
+        logger.warning(f"Product without name and full_name: {product}")
+        return None
+    return PRODUCT_ENDPOINT, product
+
+TRANSFORMS = {
+    "gros-products": gros_record,
+    "gros-products-csv": gros_csv_row,
+    "tigre-products": tigre_product,
+    "tigre-products-csv": tigre_csv_row,
+    "stores": store,
+}
+
+def get_transform(name: str) -> Callable[[Any], Item]:
+    """A transform of TRANSFORMS, or any callable given as "package.module:function"."""
+    if name in TRANSFORMS:
+        return TRANSFORMS[name]
+    if ":" in name:
+        module, attribute = name.split(":", 1)
+        return getattr(importlib.import_module(module), attribute)
+    raise ValueError(f"Unknown transform {name!r}, expected one of {sorted(TRANSFORMS)} or module:function")
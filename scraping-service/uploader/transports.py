@@ -0,0 +1,203 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import aiohttp
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.exceptions import RequestException
+
+from .bulk_client import BATCH_SIZE, PRODUCT_ENDPOINT, PRODUCT_RECEIVER_BASE_URL, BulkClient, product_label
+from .in_flight import bounded_as_completed, bounded_submit
+from .sources import CSV_CHUNK_ROWS, iter_in_thread
+
+# Transports send the (endpoint, payload) items of an upload and count the outcome.
+# Products go to a BulkClient when batch_size > 0; everything else (stores, or products with
+# batching off) is one request per item with the same retry policy: network errors and 5xx are
+# retried with exponential backoff, 4xx mean the payload is wrong and are not.
+# ThreadedTransport sends from a thread pool with requests. AsyncTransport sends from one event
+# loop with aiohttp while the input is read and transformed in a worker thread, in chunks.
+# Both keep at most max_in_flight requests pending (workers * 4 and workers * 2 by default).
+
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", 5))
+BACKOFF_FACTOR = float(os.getenv("BACKOFF_FACTOR", 2))
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 60))
+MAX_THREADS = int(os.getenv("MAX_THREADS", 12))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 100))
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", 0))
+
+logger = logging.getLogger(__name__)
+
+def _chunked(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class Transport:
+    """Counters, bulk routing and retry decisions shared by the transports."""
+
+    default_workers = MAX_THREADS
+    in_flight_per_worker = 4
+
+    def __init__(
+        self,
+        base_url: str = PRODUCT_RECEIVER_BASE_URL,
+        workers: int = None,
+        max_in_flight: int = None,
+        batch_size: int = BATCH_SIZE,
+        max_retries: int = MAX_RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.workers = max(1, workers or self.default_workers)
+        self.max_in_flight = max_in_flight or MAX_IN_FLIGHT or self.workers * self.in_flight_per_worker
+        self.batch_size = batch_size
+        self.max_retries = max(1, max_retries)
+        self.backoff_factor = backoff_factor
+        self.stats = {"sent": 0, "invalid": 0, "failed": 0, "requests": 0}
+        self._lock = threading.Lock()
+
+    def send(self, items) -> dict:
+        """Sends every (endpoint, payload) of items. Returns: The counters so far."""
+        raise NotImplementedError
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.stats[counter] += amount
+
+    def _bulk_client(self):
+        if self.batch_size <= 0:
+            return None
+        return BulkClient(
+            base_url=self.base_url,
+            batch_size=self.batch_size,
+            max_retries=self.max_retries,
+            backoff_factor=self.backoff_factor,
+        )
+
+    def _route(self, items, bulk):
+        # Hands the products to the bulk client and yields what has to be sent one by one
+        for endpoint, payload in items:
+            if bulk is not None and endpoint == PRODUCT_ENDPOINT:
+                bulk.add(payload)
+            else:
+                yield endpoint, payload
+
+    def _close_bulk(self, bulk):
+        if bulk is None:
+            return
+        for counter, amount in bulk.close().items():
+            self._count(counter, amount)
+
+    def _settled(self, endpoint: str, payload: dict, status, body: str) -> bool:
+        # True when the item is done with, False when it is worth another attempt
+        if status is not None and 200 <= status < 300:
+            self._count("sent")
+            logger.debug(f"Sent to /{endpoint}: {product_label(payload)}")
+            return True
+        if status is not None and 400 <= status < 500:
+            self._count("invalid")
+            logger.error(f"Rejected by /{endpoint} with HTTP {status}: {product_label(payload)} {body}")
+            return True
+        if status is not None:
+            logger.warning(f"HTTP {status} from /{endpoint} for {product_label(payload)}: {body}")
+        return False
+
+    def _give_up(self, endpoint: str, payload: dict):
+        self._count("failed")
+        logger.error(f"Failed to send to /{endpoint} after {self.max_retries} attempts: {product_label(payload)}")
+
+class ThreadedTransport(Transport):
+    """One requests session per thread of a pool of workers."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+
+    def send(self, items) -> dict:
+        bulk = self._bulk_client()
+        calls = ((self._post, endpoint, payload) for endpoint, payload in self._route(items, bulk))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in bounded_submit(executor, calls, self.max_in_flight):
+                future.result()
+        self._close_bulk(bulk)
+        return dict(self.stats)
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _post(self, endpoint: str, payload: dict):
+        url = f"{self.base_url}/{endpoint}"
+        for attempt in range(1, self.max_retries + 1):
+            self._count("requests")
+            try:
+                response = self._session().post(url, json=payload, timeout=REQUEST_TIMEOUT)
+                status, body = response.status_code, response.text
+            except RequestException as e:
+                logger.warning(f"Network error sending {product_label(payload)} to /{endpoint}: {e}")
+                status, body = None, ""
+            if self._settled(endpoint, payload, status, body):
+                return
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_factor ** attempt)
+        self._give_up(endpoint, payload)
+
+class AsyncTransport(Transport):
+    """aiohttp requests from one event loop; workers is the number of open connections."""
+
+    default_workers = MAX_CONCURRENT_REQUESTS
+    in_flight_per_worker = 2
+
+    def send(self, items) -> dict:
+        return asyncio.run(self.send_async(items))
+
+    async def send_async(self, items) -> dict:
+        bulk = self._bulk_client()
+        connector = aiohttp.TCPConnector(limit=self.workers)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+            async def posts():
+                # Reading, transforming and bulk batching run in the worker thread
+                async for chunk in iter_in_thread(_chunked(self._route(items, bulk), CSV_CHUNK_ROWS)):
+                    for endpoint, payload in chunk:
+                        yield self._post(session, endpoint, payload)
+
+            async for task in bounded_as_completed(posts(), self.max_in_flight):
+                task.result()
+        await asyncio.to_thread(self._close_bulk, bulk)
+        return dict(self.stats)
+
+    async def _post(self, session: aiohttp.ClientSession, endpoint: str, payload: dict):
+        url = f"{self.base_url}/{endpoint}"
+        for attempt in range(1, self.max_retries + 1):
+            self._count("requests")
+            try:
+                async with session.post(url, json=payload) as response:
+                    status, body = response.status, await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Network error sending {product_label(payload)} to /{endpoint}: {e!r}")
+                status, body = None, ""
+            if self._settled(endpoint, payload, status, body):
+                return
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.backoff_factor ** attempt)
+        self._give_up(endpoint, payload)
+
+TRANSPORTS = {
+    "threads": ThreadedTransport,
+    "asyncio": AsyncTransport,
+}
+
+def get_transport(name: str, **options) -> Transport:
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {name!r}, expected one of {sorted(TRANSPORTS)}")
+    return TRANSPORTS[name](**options)